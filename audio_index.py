@@ -0,0 +1,200 @@
+import os
+import re
+import difflib
+import threading
+import unicodedata
+from collections import OrderedDict
+from config import AUDIO_DIR
+from lesson_store import split_title
+from metrics import span, timed, hit, miss
+
+AUDIO_EXTENSIONS = (".mp3", ".m4a", ".wav", ".ogg")
+
+# "01. 조깅.mp3", "1 - 조깅.mp3", "01_조깅.mp3" → (번호, 제목)
+NUMBERED_NAME = re.compile(r"\s*(\d+)\s*[.\-_)]?\s*(.*)")
+
+# 번호 없는 파일을 제목으로 짝지을 때 필요한 최소 유사도
+TITLE_MATCH_CUTOFF = 0.75
+
+# 메모리에 올려 둘 오디오 파일 수 (현재 ± 이웃 Lesson)
+AUDIO_BYTES_CACHE_SIZE = 8
+
+
+# -------------------------------
+# 🔹 파일명 정규화
+# -------------------------------
+def normalize_name(name):
+    """NFC 정규화 + 대소문자·공백 통일 (macOS NFD 파일명도 같은 값이 되도록)"""
+    name = unicodedata.normalize("NFC", name)
+    return " ".join(name.casefold().split())
+
+
+def parse_audio_name(file_name):
+    """파일명 → (번호 또는 None, 정규화된 제목)"""
+    stem = os.path.splitext(unicodedata.normalize("NFC", file_name))[0]
+    m = NUMBERED_NAME.fullmatch(stem)
+    if m:
+        return int(m.group(1)), normalize_name(m.group(2))
+    return None, normalize_name(stem)
+
+
+def _title_keys(lesson_obj):
+    title_en, title_ko = split_title(lesson_obj["title"])
+    return [normalize_name(t) for t in (title_ko, title_en) if t]
+
+
+# -------------------------------
+# 🔹 오디오 인덱스 (폴더를 한 번만 스캔)
+# -------------------------------
+class AudioIndex:
+    """
+    AUDIO_DIR을 한 번 스캔해 {번호: [(정규화 제목, 경로)]}와 번호 없는 파일 목록을 만든다.
+    폴더 mtime이 바뀌었을 때만 다시 스캔하므로 렌더링마다 파일 시스템을 확인하지 않는다.
+    Lesson별 짝짓기 결과(제목 유사도 비교 포함)는 스캔할 때마다 비우고 처음 찾을 때 한 번만 계산한다.
+    """
+
+    def __init__(self, audio_dir=AUDIO_DIR):
+        self.audio_dir = audio_dir
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._by_number = {}
+        self._unnumbered = []
+        self._files = []
+        self._matches = {}      # (lesson 번호, 제목) → 경로 또는 None
+
+    def _dir_mtime(self):
+        try:
+            return os.stat(self.audio_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _scan(self):
+        by_number, unnumbered, files = {}, [], []
+        try:
+            entries = sorted(os.scandir(self.audio_dir), key=lambda e: e.name)
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if not entry.is_file() or not entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                continue
+            number, title = parse_audio_name(entry.name)
+            files.append(entry.path)
+            if number is None:
+                unnumbered.append((title, entry.path))
+            else:
+                by_number.setdefault(number, []).append((title, entry.path))
+        return by_number, unnumbered, files
+
+    def refresh(self):
+        mtime = self._dir_mtime()
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with span("audio.scan"):
+                self._by_number, self._unnumbered, self._files = self._scan()
+            self._matches = {}
+            self._mtime = mtime
+
+    @timed("audio.lookup")
+    def lookup(self, lesson_obj):
+        """레슨에 해당하는 오디오 경로 (없으면 None). 같은 스캔 안에서는 dict 조회 한 번"""
+        self.refresh()
+        key = (lesson_obj["lesson"], lesson_obj["title"])
+        matches = self._matches
+        if key in matches:
+            return matches[key]
+        path = matches[key] = self._match(lesson_obj)
+        return path
+
+    def _match(self, lesson_obj):
+        keys = _title_keys(lesson_obj)
+        candidates = self._by_number.get(lesson_obj["lesson"], [])
+        if len(candidates) == 1:
+            return candidates[0][1]
+        if candidates:
+            # 같은 번호가 여러 개면 제목이 가장 비슷한 파일
+            return max(candidates, key=lambda c: _similarity(c[0], keys))[1]
+        # 번호 없는 파일은 제목 유사도로만 짝지음
+        best = max(self._unnumbered, key=lambda c: _similarity(c[0], keys), default=None)
+        if best and _similarity(best[0], keys) >= TITLE_MATCH_CUTOFF:
+            return best[1]
+        return None
+
+    def report(self, lessons):
+        """(오디오가 없는 Lesson 번호 목록, 어느 Lesson에도 연결되지 않은 파일 목록)"""
+        self.refresh()
+        used, missing = set(), []
+        for lesson_obj in lessons:
+            path = self.lookup(lesson_obj)
+            if path:
+                used.add(path)
+            else:
+                missing.append(lesson_obj["lesson"])
+        unmapped = [p for p in self._files if p not in used]
+        return missing, unmapped
+
+
+def _similarity(title, keys):
+    return max((difflib.SequenceMatcher(None, title, k).ratio() for k in keys), default=0.0)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_audio_index(audio_dir=AUDIO_DIR):
+    """폴더별로 하나의 AudioIndex만 만들어 재사용"""
+    audio_dir = os.path.abspath(audio_dir)
+    index = _indexes.get(audio_dir)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.setdefault(audio_dir, AudioIndex(audio_dir))
+    return index
+
+
+def drop_audio_index(audio_dir):
+    with _indexes_lock:
+        _indexes.pop(os.path.abspath(audio_dir), None)
+
+
+# -------------------------------
+# 🔹 오디오 바이트 캐시 (프로세스 공용 LRU)
+# -------------------------------
+_bytes_cache = OrderedDict()
+_bytes_lock = threading.Lock()
+
+
+def read_audio(path):
+    """파일 내용을 (경로, mtime, 크기) 기준으로 캐시해 세션마다 디스크에서 다시 읽지 않음"""
+    st_ = os.stat(path)
+    key = (path, st_.st_mtime_ns, st_.st_size)
+    with _bytes_lock:
+        data = _bytes_cache.get(key)
+        if data is not None:
+            _bytes_cache.move_to_end(key)
+            hit("audio_bytes")
+            return data
+    miss("audio_bytes")
+    with open(path, "rb") as f:
+        data = f.read()
+    with _bytes_lock:
+        _bytes_cache[key] = data
+        while len(_bytes_cache) > AUDIO_BYTES_CACHE_SIZE:
+            _bytes_cache.popitem(last=False)
+    return data
+
+
+# -------------------------------
+# 🚀 실행 진입점: 누락/미연결 파일 일괄 점검
+# -------------------------------
+if __name__ == "__main__":
+    from lesson_store import get_store
+
+    missing, unmapped = get_audio_index().report(get_store().all())
+    print(f"🎧 오디오 점검: {AUDIO_DIR}")
+    print(f"   오디오 없는 Lesson ({len(missing)}개): {', '.join(f'{n:02d}' for n in missing) or '-'}")
+    print(f"   연결되지 않은 파일 ({len(unmapped)}개):")
+    for path in unmapped:
+        print(f"     - {os.path.basename(path)}")
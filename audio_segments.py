@@ -0,0 +1,268 @@
+import os
+import json
+import hashlib
+import argparse
+import importlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import AUDIO_SEGMENTS_JSON
+
+# 알고리즘·파라미터가 바뀌면 올려서 저장된 무음 구간을 다시 계산
+SEGMENTER_VERSION = 1
+
+SAMPLE_RATE = 16000        # 분석용 디코딩 샘플레이트 (모노)
+FRAME_MS = 20              # 에너지 계산 프레임 길이
+MIN_SILENCE_MS = 250       # 이보다 짧은 무음은 문장 경계로 보지 않음
+SILENCE_MARGIN_DB = 12     # 바닥 잡음(하위 10%) 대비 이만큼 이하면 무음
+SEGMENT_PAD_MS = 80        # 문장 앞뒤로 남겨 둘 여유
+
+
+# -------------------------------
+# 🔹 무음 구간 검출 (로컬 디코딩, 외부 서비스 없음)
+# -------------------------------
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _require(module):
+    """선택 패키지(numpy·miniaudio) import. 없으면 설치 방법을 알려 주고 종료"""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise SystemExit(
+            f"❌ 오디오 분석에는 {module}가 필요합니다: pip install -r requirements-optional.txt"
+        )
+
+
+def decode_mono(path):
+    """오디오 파일 → 16kHz 모노 int16 numpy 배열 (numpy·miniaudio 필요, requirements-optional.txt)"""
+    miniaudio = _require("miniaudio")
+    np = _require("numpy")
+
+    decoded = miniaudio.decode_file(
+        path, output_format=miniaudio.SampleFormat.SIGNED16, nchannels=1, sample_rate=SAMPLE_RATE
+    )
+    return np.frombuffer(decoded.samples, dtype=np.int16)
+
+
+def detect_silences(samples):
+    """(전체 길이 ms, [[시작 ms, 끝 ms], ...]) — 프레임 RMS가 임계값 아래인 구간"""
+    np = _require("numpy")
+
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    n = len(samples) // frame
+    duration_ms = len(samples) * 1000 // SAMPLE_RATE
+    if n == 0:
+        return duration_ms, []
+    x = samples[: n * frame].astype(np.float32).reshape(n, frame)
+    db = 20 * np.log10(np.sqrt((x ** 2).mean(axis=1)) / 32768 + 1e-9)
+    threshold = max(np.percentile(db, 10) + SILENCE_MARGIN_DB, np.percentile(db, 95) - 40)
+
+    silences, start = [], None
+    min_frames = MIN_SILENCE_MS // FRAME_MS
+    for i, silent in enumerate(db < threshold):
+        if silent and start is None:
+            start = i
+        elif not silent and start is not None:
+            if i - start >= min_frames:
+                silences.append([start * FRAME_MS, i * FRAME_MS])
+            start = None
+    if start is not None and n - start >= min_frames:
+        silences.append([start * FRAME_MS, duration_ms])
+    return duration_ms, silences
+
+
+def analyze_file(path):
+    """작업 프로세스용: 파일 하나의 해시 + 무음 구간"""
+    duration_ms, silences = detect_silences(decode_mono(path))
+    return {"sha1": file_sha1(path), "duration": duration_ms, "silences": silences}
+
+
+# -------------------------------
+# 🔹 문장 정렬
+# -------------------------------
+def align(duration_ms, silences, sentences):
+    """
+    무음 구간을 경계 후보로 삼아 문장 수만큼 구간을 나눈다.
+    각 구간 길이 비율이 문장 글자 수 비율에 가장 가깝도록 경계를 고르고(DP),
+    같은 조건이면 더 긴 무음을 경계로 선호. 후보가 모자라면 글자 수 비율로 나눔.
+    반환: [[시작 ms, 끝 ms], ...] (문장 수와 같은 길이)
+    """
+    n = len(sentences)
+    if n == 0:
+        return []
+    # 앞뒤 무음은 잘라내고 안쪽 무음만 경계 후보로
+    speech_start = silences[0][1] if silences and silences[0][0] == 0 else 0
+    speech_end = silences[-1][0] if silences and silences[-1][1] >= duration_ms else duration_ms
+    gaps = [s for s in silences if s[0] > speech_start and s[1] < speech_end]
+    weights = [max(len(s), 1) for s in sentences]
+    total_w = sum(weights)
+    span = max(speech_end - speech_start, 1)
+
+    if len(gaps) < n - 1:
+        bounds, pos = [], speech_start
+        for w in weights:
+            end = pos + span * w / total_w
+            bounds.append([int(pos), int(end)])
+            pos = end
+        return bounds
+
+    # points[j]: j번째 경계 후보 (0=시작, k+1=끝). 구간 = points[a].끝 ~ points[b].시작
+    points = [[speech_start, speech_start]] + gaps + [[speech_end, speech_end]]
+    k = len(points)
+    inf = float("inf")
+
+    def cost(a, b, i):
+        dur = points[b][0] - points[a][1]
+        gap_bonus = (points[b][1] - points[b][0]) / span if b < k - 1 else 0
+        return (dur / span - weights[i] / total_w) ** 2 - 0.01 * gap_bonus
+
+    # best[i][b]: 문장 i개로 points[b]까지 나눴을 때 최소 비용
+    best = [[inf] * k for _ in range(n + 1)]
+    back = [[0] * k for _ in range(n + 1)]
+    best[0][0] = 0.0
+    for i in range(1, n + 1):
+        for b in range(i, k):
+            for a in range(i - 1, b):
+                if best[i - 1][a] == inf:
+                    continue
+                c = best[i - 1][a] + cost(a, b, i - 1)
+                if c < best[i][b]:
+                    best[i][b], back[i][b] = c, a
+    bounds, b = [], k - 1
+    for i in range(n, 0, -1):
+        a = back[i][b]
+        start = max(points[a][1] - SEGMENT_PAD_MS, 0)
+        end = min(points[b][0] + SEGMENT_PAD_MS, duration_ms)
+        bounds.append([start, end])
+        b = a
+    return bounds[::-1]
+
+
+# -------------------------------
+# 🔹 색인 파일 (audio_segments.json)
+# -------------------------------
+def load_segments_file(path=AUDIO_SEGMENTS_JSON):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get("version") != SEGMENTER_VERSION:
+        return {}
+    return data.get("lessons", {})
+
+
+def save_segments_file(entries, path=AUDIO_SEGMENTS_JSON):
+    data = {"version": SEGMENTER_VERSION, "lessons": entries}
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+
+def build_segments(lessons, audio_index, out_path=AUDIO_SEGMENTS_JSON, jobs=None, force=False):
+    """
+    Lesson별 오디오의 문장 구간을 계산해 저장.
+    - 오디오 해시가 같으면 저장된 무음 구간을 재사용 (디코딩 생략)
+    - 문장만 바뀐 경우에도 정렬만 다시 수행
+    - 새로/바뀐 오디오는 프로세스 풀에서 병렬 분석
+    """
+    old = {} if force else load_segments_file(out_path)
+    entries, todo = {}, {}
+    for lesson_obj in lessons:
+        path = audio_index.lookup(lesson_obj)
+        if not path:
+            continue
+        key = str(lesson_obj["lesson"])
+        prev = old.get(key)
+        if prev and prev["sha1"] == file_sha1(path):
+            entries[key] = prev
+        else:
+            todo[key] = path
+
+    if todo:
+        print(f"🎧 오디오 {len(todo)}개 분석 (나머지 {len(entries)}개는 저장된 결과 사용)")
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(analyze_file, path): key for key, path in todo.items()}
+            for done, fut in enumerate(as_completed(futures), 1):
+                key = futures[fut]
+                entries[key] = fut.result()
+                print(f"[{done}/{len(todo)}] ✅ Lesson {int(key):02d}")
+
+    for lesson_obj in lessons:
+        entry = entries.get(str(lesson_obj["lesson"]))
+        if entry:
+            entry["segments"] = align(entry["duration"], entry["silences"], lesson_obj["sentences"])
+
+    save_segments_file(entries, out_path)
+    print(f"✅ 문장 구간 저장 완료 ({len(entries)}개 Lesson) → {out_path}")
+    return entries
+
+
+# -------------------------------
+# 🔹 앱용 조회 (파일이 바뀌면 다시 읽음)
+# -------------------------------
+class SegmentIndex:
+    def __init__(self, path=AUDIO_SEGMENTS_JSON):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._entries = {}
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            self._entries = load_segments_file(self.path) if mtime else {}
+            self._mtime = mtime
+
+    def segments(self, lesson_obj):
+        """[[시작 ms, 끝 ms], ...] 또는 None (분석 결과가 없거나 문장 수가 맞지 않을 때)"""
+        self.refresh()
+        entry = self._entries.get(str(lesson_obj["lesson"]))
+        if not entry or len(entry.get("segments", [])) != len(lesson_obj["sentences"]):
+            return None
+        return entry["segments"]
+
+
+_segment_indexes = {}
+_segment_lock = threading.Lock()
+
+
+def get_segment_index(path=AUDIO_SEGMENTS_JSON):
+    """파일별로 하나의 SegmentIndex (코스마다 audio_segments.json이 따로 있음)"""
+    path = os.path.abspath(path)
+    index = _segment_indexes.get(path)
+    if index is None:
+        with _segment_lock:
+            index = _segment_indexes.setdefault(path, SegmentIndex(path))
+    return index
+
+
+def drop_segment_index(path):
+    with _segment_lock:
+        _segment_indexes.pop(os.path.abspath(path), None)
+
+
+# -------------------------------
+# 🚀 실행 진입점
+# -------------------------------
+if __name__ == "__main__":
+    from courses import get_course
+
+    parser = argparse.ArgumentParser(description="오디오 → 문장별 시작/끝 시각 색인 (audio_segments.json)")
+    parser.add_argument("--jobs", type=int, default=None, help="분석 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--force", action="store_true", help="저장된 결과를 무시하고 모두 다시 분석")
+    parser.add_argument("--course", default=None, help="코스 id (기본: 기본 코스)")
+    args = parser.parse_args()
+
+    course = get_course(args.course)
+    build_segments(course.store.all(), course.audio_index, course.segments_json, jobs=args.jobs, force=args.force)
@@ -0,0 +1,106 @@
+import os
+import sys
+import re
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import LESSONS_JSON
+from make_lessons_json import split_lessons, extract_sections
+
+
+# -------------------------------
+# 🔹 비교 대상: 이전 구현 (라벨마다 re.split + 정리용 re.sub 4회)
+# -------------------------------
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = re.sub(r"^\s*[|.\-·]*\s*(English Sentences?|영어 문장).*", "", text, flags=re.I | re.M)
+    text = re.sub(r"^\s*[|.\-·]*\s*(Korean Translation|한국어 번역).*", "", text, flags=re.I | re.M)
+    text = re.sub(r"^\s*[|.\-·]*\s*(Grammar.*|문법.*|표현 포인트.*)", "", text, flags=re.I | re.M)
+    text = re.sub(r"^\s*[|.\-·]*\s*(Speaking Practice|말하기 연습|연습).*", "", text, flags=re.I | re.M)
+    return text.strip(" \n\t|·")
+
+
+def legacy_clean_list(lst):
+    return [t for t in (legacy_clean_text(item) for item in lst) if t]
+
+
+def legacy_extract_sections(body_text):
+    labels = [
+        r"🗣\s*영어 문장.*?|영어 문장.*?",
+        r"🇰🇷\s*한국어 번역.*?|한국어 번역.*?",
+        r"💡\s*문법.*?|문법.*?",
+        r"📝\s*말하기.*?|말하기.*?"
+    ]
+    parts = re.split("(" + "|".join(labels) + ")", body_text)
+
+    def get_content(label_text):
+        try:
+            idx = next(i for i, t in enumerate(parts) if re.match(label_text, t or "", flags=re.I))
+            return parts[idx + 1].strip()
+        except StopIteration:
+            return ""
+
+    english = legacy_clean_text(get_content(labels[0]))
+    korean = legacy_clean_text(get_content(labels[1]))
+    grammar = legacy_clean_list(get_content(labels[2]).splitlines())
+    practice = legacy_clean_list(get_content(labels[3]).splitlines())
+    return english, korean, grammar, practice
+
+
+# -------------------------------
+# 🔹 합성 문서 (lessons.json 내용을 PDF 추출 텍스트 모양으로 반복)
+# -------------------------------
+def render_body(lesson_obj):
+    return "\n".join([
+        "영어 문장 | English Sentences",
+        lesson_obj["english"],
+        "한국어 번역 | Korean Translation",
+        lesson_obj["korean"],
+        "문법표현 포인트 | Grammar & Expressions",
+        *lesson_obj["grammar"],
+        "말하기 연습 | Speaking Practice",
+        *lesson_obj["practice"],
+    ])
+
+
+def synthetic_document(lessons, count):
+    blocks = []
+    for n in range(count):
+        src = lessons[n % len(lessons)]
+        blocks.append(f"DAY {n % 100:02d} — {src['title']}\n{render_body(src)}")
+    return "\n".join(blocks)
+
+
+def timed(func, bodies, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for body in bodies:
+            func(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# -------------------------------
+# 🚀 실행 진입점
+# -------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="extract_sections 속도 비교 (이전 구현 vs 단일 패스)")
+    parser.add_argument("--lessons", type=int, default=1000, help="합성 문서의 Lesson 수")
+    parser.add_argument("--rounds", type=int, default=5, help="반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    with open(LESSONS_JSON, "r", encoding="utf-8") as f:
+        source = json.load(f)
+    bodies = [body for _, _, body in split_lessons(synthetic_document(source, args.lessons))]
+
+    legacy = timed(legacy_extract_sections, bodies, args.rounds)
+    current = timed(extract_sections, bodies, args.rounds)
+    print(f"📊 합성 문서 {len(bodies)}개 Lesson, {args.rounds}회 중 최솟값")
+    print(f"   이전 구현  : {legacy * 1000:8.1f} ms")
+    print(f"   단일 패스  : {current * 1000:8.1f} ms")
+    print(f"   속도 향상  : {legacy / current:8.1f}x")
@@ -0,0 +1,256 @@
+import os
+import sys
+import io
+import json
+import time
+import platform
+import argparse
+import itertools
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from config import SOURCE_PDF, LESSONS_JSON, LESSONS_BIN
+from make_lessons_json import extract_text, split_lessons, extract_sections
+from lesson_store import LessonStore
+from worksheet import create_pdf_buffer, create_workbook_buffer
+
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+# 이전 결과 대비 p50이 이 비율 이상 느려지면 회귀로 표시
+REGRESSION_RATIO = 1.2
+# 1ms 미만 차이는 측정 잡음으로 보고 무시
+MIN_DELTA_MS = 1.0
+
+
+# -------------------------------
+# 🔹 측정 도우미
+# -------------------------------
+def percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def measure(name, func, repeat=5, units=1, unit="call", warmup=1):
+    """
+    func()를 repeat번 실행해 지연시간(ms) p50/p99와 처리량(units/초)을 잰다.
+    메모리 최고치는 tracemalloc이 시간을 왜곡하지 않도록 따로 한 번 더 실행해서 잰다.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            func()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    p50 = percentile(times, 50)
+    result = {
+        "name": name,
+        "repeat": repeat,
+        "units": units,
+        "unit": unit,
+        "p50_ms": round(p50, 3),
+        "p99_ms": round(percentile(times, 99), 3),
+        "min_ms": round(min(times), 3),
+        "throughput_per_s": round(units / (p50 / 1000), 2) if p50 else None,
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+    print(
+        f"  {name:<36} p50 {result['p50_ms']:9.2f} ms  p99 {result['p99_ms']:9.2f} ms  "
+        f"{result['throughput_per_s'] or 0:10.1f} {unit}/s  peak {result['peak_mem_kb']:9.1f} KB"
+    )
+    return result
+
+
+# -------------------------------
+# 🔹 벤치마크 묶음
+# -------------------------------
+def bench_extraction(scales, repeat):
+    """PDF 추출(페이지 캐시 없이) + 원본/합성 배율 문서의 Lesson 분리·섹션 파싱"""
+    results = []
+    if os.path.exists(SOURCE_PDF):
+        results.append(measure(
+            "extract_text (pdf, no cache)", lambda: extract_text(SOURCE_PDF, jobs=1, cache_dir=None),
+            repeat=max(1, repeat // 5), warmup=0, unit="doc",
+        ))
+        with contextlib.redirect_stdout(io.StringIO()):
+            full_text = extract_text(SOURCE_PDF, jobs=1, cache_dir=None)
+    else:
+        print(f"  ⚠️ {SOURCE_PDF} 없음 → 추출 단계 생략, lessons.json으로 합성 문서만 사용")
+        from bench_sections import synthetic_document
+        with open(LESSONS_JSON, "r", encoding="utf-8") as f:
+            full_text = synthetic_document(json.load(f), 30)
+
+    for scale in scales:
+        # 원본 추출 텍스트를 그대로 반복 (DAY 머리글·줄바꿈 모양이 실제와 같음)
+        text = "\n".join([full_text] * scale)
+        blocks = split_lessons(text)
+        bodies = [body for _, _, body in blocks]
+        results.append(measure(
+            f"split_lessons x{scale}", lambda: split_lessons(text),
+            repeat=repeat, units=len(blocks), unit="lesson",
+        ))
+        results.append(measure(
+            f"extract_sections x{scale}", lambda: [extract_sections(b) for b in bodies],
+            repeat=repeat, units=len(bodies), unit="lesson",
+        ))
+    return results
+
+
+def bench_pdf(lessons, repeat, batch_sizes):
+    """학습지 PDF: Lesson 하나씩 / 여러 Lesson 묶음 (캐시 없이 매번 생성)"""
+    results = [measure(
+        "create_pdf_buffer (per lesson)",
+        lambda it=itertools.cycle(lessons): create_pdf_buffer(next(it)),
+        repeat=max(repeat, len(lessons)), unit="lesson",
+    )]
+    for size in batch_sizes:
+        batch = (lessons * (size // len(lessons) + 1))[:size]
+        results.append(measure(
+            f"create_workbook_buffer x{size}", lambda: create_workbook_buffer(batch),
+            repeat=max(1, repeat // 2), units=size, unit="lesson",
+        ))
+    return results
+
+
+def bench_load(repeat):
+    """load_lessons 경로: 새 저장소로 처음 읽기(cold)와 변경 없는 재호출(warm)"""
+    results = []
+    for label, path in (("json", LESSONS_JSON), ("bin", LESSONS_BIN)):
+        if not os.path.exists(path):
+            continue
+        if label == "bin":
+            from lesson_bin import MmapLessonStore as store_cls
+        else:
+            store_cls = LessonStore
+        # bin 저장소는 지연 디코딩이므로 전체 순회까지 포함해 비교
+        results.append(measure(
+            f"load_lessons cold ({label})", lambda: list(store_cls(path).all()),
+            repeat=repeat, unit="load",
+        ))
+        store = store_cls(path)
+        store.all()
+        results.append(measure(
+            f"load_lessons warm ({label})", lambda: store.all(),
+            repeat=repeat * 20, unit="load",
+        ))
+    return results
+
+
+def bench_streamlit(repeat):
+    """streamlit.testing으로 첫 화면 + '다음' 버튼 rerun 시간"""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("  ⚠️ streamlit.testing 없음 → 화면 rerun 생략")
+        return []
+    app_path = os.path.join(BASE_DIR, "speaking_matrix.py")
+
+    def first_run():
+        at = AppTest.from_file(app_path, default_timeout=120).run()
+        if at.exception:
+            raise RuntimeError(at.exception)
+        return at
+
+    at = first_run()
+    index = next(i for i, b in enumerate(at.button) if "다음" in b.label)
+
+    def rerun():
+        at.button[index].click().run()
+
+    return [
+        measure("streamlit first run", first_run, repeat=max(1, repeat // 2), unit="run"),
+        measure("streamlit rerun (next lesson)", rerun, repeat=repeat, unit="run"),
+    ]
+
+
+# -------------------------------
+# 🔹 결과 저장 / 이전 결과와 비교
+# -------------------------------
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def save_results(results, out_path):
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {out_path}")
+
+
+def compare(results, baseline_path, ratio=REGRESSION_RATIO):
+    """이전 결과 파일과 p50 비교. 회귀 항목 이름 목록을 반환"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n📈 비교 기준: {baseline_path}")
+    for r in results:
+        old = baseline.get(r["name"])
+        if not old or not old["p50_ms"]:
+            continue
+        change = r["p50_ms"] / old["p50_ms"]
+        regressed = change >= ratio and r["p50_ms"] - old["p50_ms"] >= MIN_DELTA_MS
+        mark = "❌" if regressed else "✅"
+        print(f"  {mark} {r['name']:<36} {old['p50_ms']:9.2f} → {r['p50_ms']:9.2f} ms ({change:5.2f}x)")
+        if regressed:
+            regressions.append(r["name"])
+    return regressions
+
+
+# -------------------------------
+# 🚀 실행 진입점
+# -------------------------------
+if __name__ == "__main__":
+    groups = ("extract", "pdf", "load", "streamlit")
+    parser = argparse.ArgumentParser(description="추출·PDF·로딩·화면 rerun 성능 측정 (오프라인)")
+    parser.add_argument("--only", nargs="+", choices=groups, default=list(groups), help="실행할 묶음")
+    parser.add_argument("--repeat", type=int, default=10, help="항목별 반복 횟수")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="합성 문서 배율")
+    parser.add_argument("--batches", type=int, nargs="+", default=[10, 30], help="묶음 PDF 크기")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: benchmarks/results/bench_<시각>.json)")
+    parser.add_argument("--compare", default=None, help="이전 결과 JSON과 비교 (회귀가 있으면 종료 코드 1)")
+    args = parser.parse_args()
+
+    with open(LESSONS_JSON, "r", encoding="utf-8") as f:
+        lessons = json.load(f)
+
+    results = []
+    if "extract" in args.only:
+        print("📄 추출")
+        results += bench_extraction(args.scales, args.repeat)
+    if "pdf" in args.only:
+        print("🧾 학습지 PDF")
+        results += bench_pdf(lessons, args.repeat, args.batches)
+    if "load" in args.only:
+        print("📚 Lesson 로딩")
+        results += bench_load(args.repeat)
+    if "streamlit" in args.only:
+        print("🖥️ Streamlit rerun")
+        results += bench_streamlit(args.repeat)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_results(results, out)
+    if args.compare and compare(results, args.compare):
+        sys.exit(1)
@@ -9,12 +9,83 @@ AUDIO_DIR = os.path.join(BASE_DIR, "audio")
 # 🔹 PDF 생성 경로
 PDF_OUTPUT_DIR = os.path.join(BASE_DIR, "generated_pdfs")
 
+# 🔹 학습지 PDF 캐시 (메모리 LRU 크기 / 디스크 캐시 사용 여부)
+PDF_CACHE_DIR = os.path.join(PDF_OUTPUT_DIR, "cache")
+PDF_CACHE_SIZE = 64
+PDF_DISK_CACHE = True
+
+# 🔹 여러 Lesson 합본 PDF 디스크 캐시 (범위마다 파일이 생기므로 따로 두고 전체 크기를 제한,
+#    넘으면 가장 오래 안 쓴 파일부터 지움. PDF_DISK_CACHE=False면 매번 임시 파일로 만듦)
+WORKBOOK_CACHE_DIR = os.path.join(PDF_OUTPUT_DIR, "workbooks")
+WORKBOOK_CACHE_MB = 256
+
+# 🔹 True면 "학습지 PDF 만들기"를 눌렀을 때만 PDF 생성 (reportlab도 그때 로드)
+PDF_ON_DEMAND = True
+
+# 🔹 앱에서 한 번에 받을 수 있는 Lesson 수 (Streamlit 다운로드는 파일 전체를 메모리에 만듦.
+#    더 큰 범위는 lesson_api.py의 /workbooks/<a>-<b>.pdf|zip 스트리밍 사용)
+EXPORT_APP_MAX_LESSONS = 30
+
 # 🔹 JSON 데이터 파일
 LESSONS_JSON = os.path.join(BASE_DIR, "lessons.json")
 
+# 🔹 문장별 오디오 구간 색인 (audio_segments.py가 생성)
+AUDIO_SEGMENTS_JSON = os.path.join(BASE_DIR, "audio_segments.json")
+
+# 🔹 검색 색인 (search_index.py가 lessons.json 해시와 함께 저장)
+SEARCH_INDEX_JSON = os.path.join(BASE_DIR, "search_index.json")
+
+# 🔹 mmap용 압축 바이너리 (make_lessons_json.py가 함께 생성)
+LESSONS_BIN = os.path.join(BASE_DIR, "lessons.bin")
+
+# 🔹 앱이 읽을 형식: "json" (lessons.json 전체 로드) 또는 "bin" (lessons.bin을 mmap으로 필요한 Lesson만)
+LESSON_STORE_FORMAT = "json"
+
+# 🔹 여러 코스 (courses.py): courses/<코스 id>/ 아래에 lessons.json(.bin), audio/, course.json(제목)
+# 위 경로의 기본 코스는 항상 "default"로 포함. 코스 데이터는 처음 열 때 읽고,
+# 불러온 코스들의 추정 메모리가 한도를 넘으면 가장 오래 안 쓴 코스부터 내림
+COURSES_DIR = os.path.join(BASE_DIR, "courses")
+DEFAULT_COURSE = "default"
+COURSE_MEMORY_BUDGET_MB = 256
+
+# 🔹 복습(간격 반복) 기록 SQLite 파일 (review.py)
+REVIEW_DB = os.path.join(BASE_DIR, "review.sqlite3")
+
+# 🔹 JSON Lines (한 줄에 Lesson 하나, make_lessons_json.py가 함께 생성)
+LESSONS_JSONL = os.path.join(BASE_DIR, "lessons.jsonl")
+
+# 🔹 오디오 전용 HTTP 서버 (Range/ETag 지원, media_server.py)
+# True면 st.audio에 파일 대신 URL을 넘겨 브라우저가 필요한 구간만 받아가도록 함
+# (브라우저에서 MEDIA_PUBLIC_URL로 접속 가능해야 하므로 기본은 꺼 둠)
+AUDIO_SERVER = False
+MEDIA_HOST = "127.0.0.1"  # 다른 기기에서 받으려면 "0.0.0.0" (/metrics도 함께 열리므로 주의)
+MEDIA_PORT = 8765
+MEDIA_PUBLIC_URL = None  # 예: "https://media.example.com" (None이면 http://localhost:MEDIA_PORT)
+
+# 🔹 Streamlit 없이 Lesson·학습지·오디오를 제공하는 HTTP API (lesson_api.py)
+API_HOST = "127.0.0.1"
+API_PORT = 8780
+
+# 🔹 이웃 Lesson 미리 준비 (prefetch.py): 작업 스레드 수 / 학습지 PDF까지 미리 만들지
+# (PDF 예열은 PDF_ON_DEMAND=False일 때만 → 평소 화면에서는 reportlab을 불러오지 않음)
+PREFETCH_WORKERS = 2
+PREFETCH_PDF = False
+
 # 🔹 원본 PDF (옵션: make_lessons_json.py에서 사용)
 SOURCE_PDF = os.path.join(BASE_DIR, "1분영어_01-30.pdf")
 
+# 🔹 성능 계측 (metrics.py)
+# 켜 두어도 구간당 perf_counter 2번 정도라 운영에서도 사용 가능. 끄면 측정 코드가 거의 비용 없음
+METRICS_ENABLED = True
+METRICS_PANEL = False          # True면 사이드바에 rerun별 소요 시간 표시 (?debug=1 로도 열 수 있음)
+METRICS_LOG_INTERVAL = 0       # 초 단위. 0보다 크면 주기적으로 요약 한 줄을 stderr에 출력
+
+# 🔹 PDF 페이지별 추출 텍스트 캐시 (make_lessons_json.py, 원본 PDF마다 하위 폴더)
+PAGE_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "pages")
+
+# 🔹 페이지별 추출 품질 보고서 (빈 페이지·깨진 한글·빠진 DAY 머리글, make_lessons_json.py)
+PAGE_QUALITY_REPORT = os.path.join(BASE_DIR, "page_quality.json")
+
 # 폴더 자동 생성 (없으면 만들어줌)
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(PDF_OUTPUT_DIR, exist_ok=True)
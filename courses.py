@@ -0,0 +1,225 @@
+import os
+import json
+import time
+import threading
+from config import (
+    BASE_DIR, COURSES_DIR, DEFAULT_COURSE, COURSE_MEMORY_BUDGET_MB,
+    LESSONS_JSON, AUDIO_DIR, AUDIO_SEGMENTS_JSON, SEARCH_INDEX_JSON, SOURCE_PDF,
+    LESSON_STORE_FORMAT,
+)
+from lesson_store import get_store, drop_store, default_store_path
+from audio_index import get_audio_index, drop_audio_index
+from audio_segments import get_segment_index, drop_segment_index
+from metrics import incr
+
+DEFAULT_TITLE = "1분 영어 말하기"
+
+# 파일 크기 → 메모리 사용량 대략치 (dict·str 객체 오버헤드 포함)
+JSON_MEMORY_FACTOR = 6      # lessons.json 전체를 dict로 파싱
+BIN_MEMORY_FACTOR = 1       # lessons.bin은 mmap + 읽은 Lesson만 디코딩
+INDEX_MEMORY_FACTOR = 4     # search_index.json
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+# -------------------------------
+# 🔹 코스 하나 (경로 묶음 + 프로세스 공용 캐시 접근)
+# -------------------------------
+class Course:
+    """
+    코스의 파일 위치만 들고 있는 가벼운 객체. 실제 데이터(Lesson·오디오 색인·검색 색인)는
+    lesson_store / audio_index / audio_segments / search_index의 경로별 공용 캐시에서
+    처음 접근할 때 읽는다. 학습지 PDF 캐시는 내용 해시 기준이라 모든 코스가 하나를 공유.
+    """
+
+    def __init__(self, course_id, root, title=None, lessons_json=None, audio_dir=None,
+                 segments_json=None, search_index_json=None, source_pdf=None):
+        self.course_id = course_id
+        self.root = root
+        self.title = title or course_id
+        self.lessons_json = lessons_json or os.path.join(root, "lessons.json")
+        self.audio_dir = audio_dir or os.path.join(root, "audio")
+        self.segments_json = segments_json or os.path.join(root, "audio_segments.json")
+        self.search_index_json = search_index_json or os.path.join(root, "search_index.json")
+        self.source_pdf = source_pdf or os.path.join(root, "source.pdf")
+
+    @property
+    def lessons_path(self):
+        """config.LESSON_STORE_FORMAT이 "bin"이고 lessons.bin이 있으면 mmap 저장소"""
+        if LESSON_STORE_FORMAT == "bin":
+            bin_path = os.path.splitext(self.lessons_json)[0] + ".bin"
+            if os.path.exists(bin_path):
+                return bin_path
+        return self.lessons_json
+
+    @property
+    def store(self):
+        return get_store(self.lessons_path)
+
+    @property
+    def audio_index(self):
+        return get_audio_index(self.audio_dir)
+
+    @property
+    def segment_index(self):
+        return get_segment_index(self.segments_json)
+
+    @property
+    def search_index(self):
+        from search_index import get_search_index
+        return get_search_index(self.search_index_json, self.store)
+
+    def scheduler(self, learner):
+        from review import get_scheduler
+        return get_scheduler(learner, self.store)
+
+    def memory_estimate(self):
+        """불러온 상태의 추정 메모리 (바이트)"""
+        path = self.lessons_path
+        factor = BIN_MEMORY_FACTOR if path.endswith(".bin") else JSON_MEMORY_FACTOR
+        return _file_size(path) * factor + _file_size(self.search_index_json) * INDEX_MEMORY_FACTOR
+
+    def unload(self):
+        """이 코스의 데이터를 공용 캐시에서 내림 (다음 접근 때 다시 읽음)"""
+        from search_index import drop_search_index
+        from review import drop_schedulers
+        drop_schedulers(os.path.abspath(self.lessons_path))
+        drop_store(self.lessons_path)
+        drop_audio_index(self.audio_dir)
+        drop_segment_index(self.segments_json)
+        drop_search_index(self.search_index_json)
+
+    def __repr__(self):
+        return f"Course({self.course_id!r}, {self.title!r})"
+
+
+def default_course():
+    """config.py의 기존 경로를 그대로 쓰는 기본 코스"""
+    return Course(
+        DEFAULT_COURSE, BASE_DIR, DEFAULT_TITLE,
+        lessons_json=LESSONS_JSON, audio_dir=AUDIO_DIR, segments_json=AUDIO_SEGMENTS_JSON,
+        search_index_json=SEARCH_INDEX_JSON, source_pdf=SOURCE_PDF,
+    )
+
+
+def load_course(course_id, root):
+    """courses/<id>/course.json의 제목(선택)을 읽어 Course 생성"""
+    title = None
+    try:
+        with open(os.path.join(root, "course.json"), "r", encoding="utf-8") as f:
+            title = json.load(f).get("title")
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    course = Course(course_id, root, title)
+    if not os.path.exists(course.source_pdf):
+        pdfs = sorted(n for n in os.listdir(root) if n.lower().endswith(".pdf"))
+        if pdfs:
+            course.source_pdf = os.path.join(root, pdfs[0])
+    return course
+
+
+# -------------------------------
+# 🔹 코스 목록 + 메모리 한도 관리
+# -------------------------------
+class CourseRegistry:
+    """
+    COURSES_DIR의 하위 폴더 중 lessons.json/lessons.bin이 있는 곳을 코스로 등록.
+    목록은 폴더 mtime이 바뀔 때만 다시 스캔하고, 코스 데이터는 get()으로 처음 열 때 읽는다.
+    불러온 코스들의 추정 메모리 합이 한도를 넘으면 가장 오래 안 쓴 코스부터 내린다.
+    """
+
+    def __init__(self, courses_dir=COURSES_DIR, budget_mb=COURSE_MEMORY_BUDGET_MB):
+        self.courses_dir = courses_dir
+        self.budget = budget_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._courses = {}
+        self._loaded = {}       # 코스 id → 마지막 사용 시각
+
+    def _scan(self):
+        courses = {}
+        base = default_course()
+        if os.path.exists(base.lessons_json) or os.path.exists(default_store_path()):
+            courses[base.course_id] = base
+        try:
+            entries = sorted(os.scandir(self.courses_dir), key=lambda e: e.name)
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if not entry.is_dir() or entry.name == DEFAULT_COURSE:
+                continue
+            if any(os.path.exists(os.path.join(entry.path, n)) for n in ("lessons.json", "lessons.bin")):
+                courses[entry.name] = load_course(entry.name, entry.path)
+        return courses
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self.courses_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime and self._courses:
+            return
+        with self._lock:
+            self._courses = self._scan()
+            self._mtime = mtime
+
+    def courses(self):
+        """등록된 코스 목록 (데이터는 읽지 않음)"""
+        self.refresh()
+        return list(self._courses.values())
+
+    def get(self, course_id=DEFAULT_COURSE):
+        """코스를 열어 사용 표시. 새로 여는 코스면 한도를 넘는 다른 코스를 내림"""
+        self.refresh()
+        course = self._courses.get(course_id)
+        if course is None:
+            return None
+        with self._lock:
+            is_new = course_id not in self._loaded
+            self._loaded[course_id] = time.monotonic()
+            if is_new:
+                incr("course_loads")
+                self._enforce_budget(keep=course_id)
+        return course
+
+    def loaded(self):
+        return [self._courses[cid] for cid in self._loaded if cid in self._courses]
+
+    def _enforce_budget(self, keep):
+        usage = {cid: self._courses[cid].memory_estimate() for cid in self._loaded if cid in self._courses}
+        total = sum(usage.values())
+        for cid in sorted(self._loaded, key=self._loaded.get):
+            if total <= self.budget:
+                break
+            if cid == keep:
+                continue
+            course = self._courses.get(cid)
+            if course is not None:
+                course.unload()
+                incr("course_evictions")
+            total -= usage.get(cid, 0)
+            del self._loaded[cid]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CourseRegistry()
+    return _registry
+
+
+def get_course(course_id=None):
+    """코스 id → Course (없으면 기본 코스)"""
+    registry = get_registry()
+    return registry.get(course_id or DEFAULT_COURSE) or registry.get(DEFAULT_COURSE)
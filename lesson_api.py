@@ -0,0 +1,136 @@
+import re
+import json
+import hashlib
+import argparse
+from urllib.parse import urlsplit, unquote
+from http.server import ThreadingHTTPServer
+from config import API_HOST, API_PORT
+from lesson_store import lesson_to_dict
+from courses import get_registry
+from media_server import MediaHandler
+from worksheet import create_pdf_buffer, lesson_pdf_key
+from pdf_cache import get_pdf_cache
+from metrics import span, start_log_thread
+from workbook_export import EXPORT_FORMATS, select_range, export_file_name, export_key, iter_export
+
+# Lesson 데이터는 lessons.json이 바뀌면 ETag가 바뀌므로 짧게 캐시 후 재검증
+JSON_CACHE_CONTROL = "public, max-age=60"
+PDF_CACHE_CONTROL = "public, max-age=86400"
+
+
+# -------------------------------
+# 🔹 응답 본문
+# -------------------------------
+def courses_summary():
+    return [{"id": c.course_id, "title": c.title} for c in get_registry().courses()]
+
+
+def lessons_summary(store):
+    return [
+        {"lesson": l["lesson"], "title": l["title"], "title_en": l["title_en"], "title_ko": l["title_ko"]}
+        for l in store.all()
+    ]
+
+
+def _json_bytes(obj):
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# -------------------------------
+# 🔹 요청 처리 (Streamlit 없이 Lesson·학습지·오디오 제공)
+# -------------------------------
+class LessonAPIHandler(MediaHandler):
+    """
+    GET /courses                 → 코스 목록
+    아래 경로는 모두 /courses/<코스 id>/... 로 특정 코스, 접두어가 없으면 기본 코스
+    GET /lessons                 → Lesson 목록 (번호·제목)
+    GET /lessons/<n>             → Lesson 전체 필드 (JSON)
+    GET /worksheets/<n>.pdf      → 학습지 PDF (내용 해시 캐시)
+    GET /workbooks/<a>-<b>.pdf   → Lesson a~b 합본 PDF (스트리밍)
+    GET /workbooks/<a>-<b>.zip   → Lesson a~b 개별 PDF zip (Lesson마다 바로 전송)
+    GET /audio/<n>               → 오디오 (Range/ETag, MediaHandler)
+    GET /metrics                 → 계측값 (Prometheus 텍스트)
+    """
+
+    def do_GET(self, head_only=False):
+        path = unquote(urlsplit(self.path).path).rstrip("/")
+        if path == "/courses":
+            data = _json_bytes(courses_summary())
+            return self.send_bytes(
+                data, "application/json; charset=utf-8",
+                hashlib.sha1(data).hexdigest(), JSON_CACHE_CONTROL, head_only,
+            )
+
+        course, path = self.resolve_course(path)
+        if course is None:
+            return self.send_error(404)
+        store = course.store
+
+        if path == "/lessons":
+            return self.send_bytes(
+                _json_bytes(lessons_summary(store)), "application/json; charset=utf-8",
+                f"list-{store.digest}", JSON_CACHE_CONTROL, head_only,
+            )
+
+        m = re.fullmatch(r"/lessons/(\d+)", path)
+        if m:
+            lesson_obj = store.by_number(int(m.group(1)))
+            if lesson_obj is None:
+                return self.send_error(404)
+            return self.send_bytes(
+                _json_bytes(lesson_to_dict(lesson_obj)), "application/json; charset=utf-8",
+                lesson_pdf_key(lesson_obj), JSON_CACHE_CONTROL, head_only,
+            )
+
+        m = re.fullmatch(r"/worksheets/(\d+)\.pdf", path)
+        if m:
+            lesson_obj = store.by_number(int(m.group(1)))
+            if lesson_obj is None:
+                return self.send_error(404)
+            key = lesson_pdf_key(lesson_obj)
+            # 브라우저/LMS가 이미 같은 PDF를 갖고 있으면 만들지도 읽지도 않음
+            with span("api.worksheet"):
+                data = b"" if self.headers.get("If-None-Match") == f'"{key}"' else \
+                    get_pdf_cache().get_or_build(lesson_obj, create_pdf_buffer)
+            return self.send_bytes(
+                data, "application/pdf", key, PDF_CACHE_CONTROL, head_only,
+                {"Content-Disposition": f'inline; filename="Lesson_{lesson_obj["lesson"]:02d}.pdf"'},
+            )
+
+        m = re.fullmatch(r"/workbooks/(\d+)-(\d+)\.(pdf|zip)", path)
+        if m:
+            selected = select_range(store, int(m.group(1)), int(m.group(2)))
+            if not selected:
+                return self.send_error(404)
+            fmt = m.group(3)
+            return self.send_stream(
+                iter_export(selected, fmt), EXPORT_FORMATS[fmt], export_key(selected, fmt),
+                PDF_CACHE_CONTROL, head_only,
+                {"Content-Disposition": f'attachment; filename="{export_file_name(selected, fmt)}"'},
+            )
+
+        return super().do_GET(head_only)
+
+
+def make_server(host=API_HOST, port=API_PORT):
+    server = ThreadingHTTPServer((host, port), LessonAPIHandler)
+    server.daemon_threads = True
+    return server
+
+
+# -------------------------------
+# 🚀 실행 진입점
+# -------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lesson·학습지 PDF·오디오 HTTP API (Streamlit 없이)")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    start_log_thread()
+    print(f"🌐 Lesson API 시작: http://{args.host}:{args.port}/lessons")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,351 @@
+import os
+import mmap
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+from lesson_store import split_title, audio_filename, split_sentences
+from metrics import incr
+from lesson_render import FRAGMENTS_VERSION, has_fragments, build_fragments
+
+# -------------------------------
+# 🔹 lessons.bin 형식 (리틀엔디언)
+# -------------------------------
+# [헤더][레코드 × n (레슨 번호순)][문자열 표 × m][문자열 id 목록][문자열 본문(UTF-8)]
+# - 같은 문자열(반복되는 문법 항목 등)은 한 번만 저장 (interning)
+# - 레코드는 고정 길이라 mmap에서 이진 탐색으로 Lesson N만 바로 읽을 수 있음
+# - 화면·PDF 조각(lesson_render)도 문자열 하나하나를 같은 방식으로 저장 (JSON으로 감싸지 않음)
+MAGIC = b"SMLB"
+FORMAT_VERSION = 3
+
+HEADER = struct.Struct("<4sHH20sIIIIII")  # magic, version, 조각 버전, 내용 해시, 레슨 수, 문자열 수, 각 구역 오프셋 4개
+RECORD = struct.Struct("<iIIIIIII" + "I" * 8)  # 번호, title, english, korean, grammar(시작, 개수), practice(시작, 개수), 조각 8개
+STRING = struct.Struct("<II")             # 본문 내 오프셋, 길이
+STRING_ID = struct.Struct("<I")
+
+# 레코드에 저장하는 조각 문자열 (조각 dict의 경로)
+FRAGMENT_FIELDS = (
+    ("source",),
+    ("html", "header"), ("html", "body"),
+    ("pdf", "title"), ("pdf", "english"), ("pdf", "korean"), ("pdf", "grammar"), ("pdf", "practice"),
+)
+
+# 디코딩한 Lesson을 보관할 개수 (화면의 현재·이웃 Lesson 정도. 전체를 훑어도 이 이상 남지 않음)
+RECORD_CACHE_SIZE = 32
+
+
+def _fragment_value(fragments, path):
+    value = fragments
+    for key in path:
+        value = value[key]
+    return value
+
+
+def _fragments_from_fields(version, values):
+    fragments = {"version": version, "html": {}, "pdf": {}}
+    for path, value in zip(FRAGMENT_FIELDS, values):
+        if len(path) == 1:
+            fragments[path[0]] = value
+        else:
+            fragments[path[0]][path[1]] = value
+    return fragments
+
+
+# -------------------------------
+# 🔹 가벼운 Lesson 레코드 (__slots__, dict처럼 읽기 가능)
+# -------------------------------
+class LessonRecord:
+    __slots__ = (
+        "lesson", "title", "english", "korean", "grammar", "practice",
+        "title_en", "title_ko", "audio_filename", "sentences", "fragments",
+    )
+
+    def __init__(self, lesson, title, english, korean, grammar, practice, fragments):
+        self.lesson = lesson
+        self.title = title
+        self.english = english
+        self.korean = korean
+        self.grammar = grammar
+        self.practice = practice
+        self.title_en, self.title_ko = split_title(title)
+        self.audio_filename = audio_filename(self)
+        self.sentences = split_sentences(english)
+        self.fragments = fragments
+        if not has_fragments(self):
+            self.fragments = build_fragments(self)
+
+    # 기존 코드의 lesson["english"], lesson.get("grammar", []) 형태를 그대로 지원
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if isinstance(key, str) else default
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def keys(self):
+        return self.__slots__
+
+    def __repr__(self):
+        return f"LessonRecord(lesson={self.lesson!r}, title={self.title!r})"
+
+
+# -------------------------------
+# 🔹 쓰기 (make_lessons_json.build_json에서 Lesson 단위로 호출)
+# -------------------------------
+class LessonBinWriter:
+    """
+    Lesson을 하나씩 받아 lessons.bin을 만든다. 문자열 본문은 임시 파일에 바로 쓰고
+    메모리에는 문자열 해시 → id 표와 고정 길이 레코드만 남긴다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._blob = open(path + ".blob.tmp", "wb")
+        self._ids = {}          # 문자열 sha1 → id
+        self._strings = []      # id → (오프셋, 길이)
+        self._id_list = []      # grammar/practice 항목의 문자열 id
+        self._records = []
+        self._digest = hashlib.sha1()
+
+    def _intern(self, text):
+        data = text.encode("utf-8")
+        key = hashlib.sha1(data).digest()
+        sid = self._ids.get(key)
+        if sid is None:
+            sid = len(self._strings)
+            self._ids[key] = sid
+            self._strings.append((self._blob.tell(), len(data)))
+            self._blob.write(data)
+        return sid
+
+    def _intern_list(self, items):
+        start = len(self._id_list)
+        self._id_list.extend(self._intern(t) for t in items)
+        return start, len(items)
+
+    def write(self, lesson_obj):
+        g_start, g_count = self._intern_list(lesson_obj.get("grammar", []))
+        p_start, p_count = self._intern_list(lesson_obj.get("practice", []))
+        fragments = lesson_obj["fragments"] if has_fragments(lesson_obj) else build_fragments(lesson_obj)
+        self._records.append((
+            lesson_obj["lesson"],
+            self._intern(lesson_obj["title"]),
+            self._intern(lesson_obj["english"]),
+            self._intern(lesson_obj["korean"]),
+            g_start, g_count, p_start, p_count,
+            *(self._intern(_fragment_value(fragments, path)) for path in FRAGMENT_FIELDS),
+        ))
+
+    def commit(self):
+        self._blob.close()
+        self._records.sort(key=lambda r: r[0])
+        records = b"".join(RECORD.pack(*r) for r in self._records)
+        strings = b"".join(STRING.pack(*s) for s in self._strings)
+        id_list = b"".join(STRING_ID.pack(i) for i in self._id_list)
+
+        records_off = HEADER.size
+        strings_off = records_off + len(records)
+        ids_off = strings_off + len(strings)
+        blob_off = ids_off + len(id_list)
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as out, open(self.path + ".blob.tmp", "rb") as blob:
+            out.write(b"\0" * HEADER.size)
+            for part in (records, strings, id_list):
+                out.write(part)
+                self._digest.update(part)
+            for block in iter(lambda: blob.read(1 << 20), b""):
+                out.write(block)
+                self._digest.update(block)
+            out.seek(0)
+            out.write(HEADER.pack(
+                MAGIC, FORMAT_VERSION, FRAGMENTS_VERSION, self._digest.digest(),
+                len(self._records), len(self._strings),
+                records_off, strings_off, ids_off, blob_off,
+            ))
+        os.remove(self.path + ".blob.tmp")
+        os.replace(tmp, self.path)
+
+    def discard(self):
+        self._blob.close()
+        os.remove(self.path + ".blob.tmp")
+
+
+def write_lessons_bin(lessons, path):
+    writer = LessonBinWriter(path)
+    for lesson_obj in lessons:
+        writer.write(lesson_obj)
+    writer.commit()
+
+
+# -------------------------------
+# 🔹 읽기: mmap 기반 저장소 (LessonStore와 같은 인터페이스)
+# -------------------------------
+class _LessonSequence:
+    """all()이 돌려주는 지연 목록: 접근한 Lesson만 디코딩"""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __len__(self):
+        return self._store._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._store._record(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._store._record(i)
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+class MmapLessonStore:
+    """
+    lessons.bin을 mmap으로 열어 필요한 Lesson만 읽는 저장소.
+    여러 작업 프로세스가 같은 파일을 열면 OS 페이지 캐시를 공유하므로
+    프로세스마다 전체 dict 사본을 들고 있지 않아도 된다.
+    """
+
+    def __init__(self, path, cache_size=RECORD_CACHE_SIZE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._mm = None
+        self._header = None
+        self._count = 0
+        self._digest = None
+        # 최근 디코딩한 Lesson만 LRU로 보관 (all()을 훑어도 전체가 메모리에 남지 않음)
+        self._cache_size = cache_size
+        self._records = OrderedDict()
+        self._records_lock = threading.Lock()
+
+    def _file_stamp(self):
+        try:
+            st_ = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st_.st_mtime_ns, st_.st_size)
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(mm, 0)
+        if header[0] != MAGIC or header[1] != FORMAT_VERSION:
+            raise ValueError(f"lessons.bin 형식이 아닙니다: {self.path}")
+        # 이전 mmap은 다른 스레드가 읽는 중일 수 있으므로 닫지 않고 GC에 맡김
+        self._mm, self._header = mm, header
+        self._count = header[4]
+        self._digest = header[3].hex()
+        self._clear_records()
+
+    def _clear_records(self):
+        with self._records_lock:
+            self._records = OrderedDict()
+
+    def refresh(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            if stamp is None:
+                self._mm, self._count, self._digest = None, 0, None
+                self._clear_records()
+            else:
+                incr("lessons_reloads")
+                self._open()
+            self._stamp = stamp
+
+    # ---- 디코딩 ----
+    def _string(self, sid):
+        off, length = STRING.unpack_from(self._mm, self._header[7] + sid * STRING.size)
+        start = self._header[9] + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _string_list(self, start, count):
+        base = self._header[8] + start * STRING_ID.size
+        return tuple(self._string(STRING_ID.unpack_from(self._mm, base + i * STRING_ID.size)[0]) for i in range(count))
+
+    def _number_at(self, pos):
+        return RECORD.unpack_from(self._mm, self._header[6] + pos * RECORD.size)[0]
+
+    def _decode(self, pos):
+        num, title, english, korean, g_start, g_count, p_start, p_count, *fragments = RECORD.unpack_from(
+            self._mm, self._header[6] + pos * RECORD.size
+        )
+        return LessonRecord(
+            num, self._string(title), self._string(english), self._string(korean),
+            self._string_list(g_start, g_count), self._string_list(p_start, p_count),
+            _fragments_from_fields(self._header[2], [self._string(sid) for sid in fragments]),
+        )
+
+    def _record(self, pos):
+        with self._records_lock:
+            rec = self._records.get(pos)
+            if rec is not None:
+                self._records.move_to_end(pos)
+                return rec
+        rec = self._decode(pos)
+        with self._records_lock:
+            self._records[pos] = rec
+            while len(self._records) > self._cache_size:
+                self._records.popitem(last=False)
+        return rec
+
+    # ---- LessonStore와 같은 인터페이스 ----
+    @property
+    def digest(self):
+        self.refresh()
+        return self._digest
+
+    def all(self):
+        self.refresh()
+        return _LessonSequence(self)
+
+    def _lower_bound(self, number):
+        """레코드는 번호순이므로 이진 탐색: number 이상인 첫 위치"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._number_at(mid) < number:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def position(self, number):
+        self.refresh()
+        lo = self._lower_bound(number)
+        if lo < self._count and self._number_at(lo) == number:
+            return lo
+        return None
+
+    def positions_between(self, first, last):
+        """first ≤ 번호 ≤ last인 Lesson들의 위치 (레코드를 디코딩하지 않음)"""
+        self.refresh()
+        return range(self._lower_bound(first), self._lower_bound(last + 1))
+
+    def by_number(self, number):
+        pos = self.position(number)
+        return None if pos is None else self._record(pos)
+
+    def __len__(self):
+        self.refresh()
+        return self._count
+
+    def __getitem__(self, index):
+        return self.all()[index]
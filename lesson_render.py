@@ -0,0 +1,116 @@
+import json
+import hashlib
+from html import escape
+from lesson_store import split_title
+from metrics import timed
+
+# 조각 모양(태그·구성)을 바꾸면 올려서 저장된 조각을 다시 만들도록 (lessons.json "fragments")
+FRAGMENTS_VERSION = 2
+
+# 조각을 만든 원본 필드 (이 내용이 바뀌면 저장된 조각은 다시 만듦)
+SOURCE_FIELDS = ("lesson", "title", "english", "korean", "grammar", "practice")
+
+# 화면 본문 섹션 제목 (st.subheader와 같은 h3)
+SECTION_TITLES = (
+    ("english", "🗣 영어 문장 | English Sentences"),
+    ("korean", "🇰🇷 한국어 번역 | Korean Translation"),
+    ("grammar", "💡 문법·표현 포인트 | Grammar &amp; Expressions"),
+    ("practice", "📝 말하기 연습 | Speaking Practice"),
+)
+
+
+# -------------------------------
+# 🔹 화면(HTML) / PDF(ReportLab) 조각 만들기 — make_lessons_json.py에서 한 번만
+# -------------------------------
+def source_digest(lesson_obj):
+    payload = [lesson_obj.get(k) for k in SOURCE_FIELDS]
+    payload = [list(v) if isinstance(v, tuple) else v for v in payload]
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _lines(text):
+    return [escape(line) for line in text.split("\n")]
+
+
+def _items(items):
+    return [escape(item) for item in items]
+
+
+def html_fragments(lesson_obj):
+    """
+    화면용 HTML. 모든 내용은 escape하고, 각 조각은 한 줄짜리 HTML 블록이라
+    st.markdown이 내용 안의 *, _ 등을 markdown으로 해석하지 않는다.
+    """
+    title_en, title_ko = split_title(lesson_obj["title"])
+    sections = {
+        "english": "<div>" + "<br>".join(_lines(lesson_obj["english"])) + "</div>",
+        "korean": "<div>" + "<br>".join(_lines(lesson_obj["korean"])) + "</div>",
+        "grammar": "<ul>" + "".join(f"<li>{g}</li>" for g in _items(lesson_obj.get("grammar", []))) + "</ul>",
+        "practice": "<ul>" + "".join(f"<li>{s}</li>" for s in _items(lesson_obj.get("practice", []))) + "</ul>",
+    }
+    return {
+        "header": (
+            f"<h2 style='margin-top:8px;'>Lesson {lesson_obj['lesson']:02d} — {escape(title_en)}"
+            + (f" | {escape(title_ko)}" if title_ko else "")
+            + "</h2>"
+        ),
+        # 본문 네 섹션을 한 번의 st.markdown으로
+        "body": "<br>".join(f"<h3>{title}</h3>{sections[key]}" for key, title in SECTION_TITLES),
+    }
+
+
+def pdf_fragments(lesson_obj):
+    """ReportLab Paragraph 마크업 (&, <, >를 escape해야 파서가 깨지지 않음)"""
+    title_en, title_ko = split_title(lesson_obj["title"])
+    return {
+        "title": (
+            f"<b>Lesson {lesson_obj['lesson']:02d} &mdash; {escape(title_en)}"
+            + (f" | {escape(title_ko)}</b>" if title_ko else "</b>")
+        ),
+        "english": "<br/>".join(_lines(lesson_obj["english"])),
+        "korean": "<br/>".join(_lines(lesson_obj["korean"])),
+        "grammar": "<br/>".join(f"&bull; {g}" for g in _items(lesson_obj.get("grammar", []))),
+        "practice": "<br/>".join(f"&bull; {s}" for s in _items(lesson_obj.get("practice", []))),
+    }
+
+
+@timed("render.build")
+def build_fragments(lesson_obj):
+    return {
+        "version": FRAGMENTS_VERSION,
+        "source": source_digest(lesson_obj),
+        "html": html_fragments(lesson_obj),
+        "pdf": pdf_fragments(lesson_obj),
+    }
+
+
+def has_fragments(lesson_obj):
+    """저장된 조각이 현재 버전이고, lessons.json을 손으로 고친 뒤에도 내용과 맞는지"""
+    fragments = lesson_obj.get("fragments")
+    return (
+        bool(fragments)
+        and fragments.get("version") == FRAGMENTS_VERSION
+        and fragments.get("source") == source_digest(lesson_obj)
+    )
+
+
+# -------------------------------
+# 🔹 조회 (요청마다 문자열을 만들지 않음)
+# -------------------------------
+def lesson_fragments(lesson_obj):
+    """
+    저장된 조각. 버전·내용 확인은 읽어 들일 때(enrich_lesson, LessonRecord) 한 번만 하므로
+    여기서는 꺼내기만 한다. 저장소를 거치지 않아 조각이 아예 없으면 그 자리에서 만든다.
+    """
+    fragments = lesson_obj.get("fragments")
+    return fragments if fragments else build_fragments(lesson_obj)
+
+
+def render_lesson(lesson_obj):
+    """화면용 조각 {"header", "body"}"""
+    return lesson_fragments(lesson_obj)["html"]
+
+
+def heading_html(text, level=3):
+    """한 줄 제목 (복습 카드 앞·뒷면 등). escape해서 st.markdown이 내용을 해석하지 않음"""
+    return f"<h{level}>{escape(text)}</h{level}>"
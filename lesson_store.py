@@ -0,0 +1,191 @@
+import os
+import json
+import bisect
+import hashlib
+import threading
+from config import LESSONS_JSON, LESSONS_BIN, LESSON_STORE_FORMAT
+from metrics import span, incr
+
+
+# -------------------------------
+# 🔹 파생 필드 계산
+# -------------------------------
+def split_title(title):
+    """'영문 | 한글' 형식의 제목을 (title_en, title_ko)로 분리"""
+    if "|" in title:
+        en, ko = title.split("|", 1)
+        return en.strip(), ko.strip()
+    return title.strip(), ""
+
+
+def audio_filename(lesson_obj):
+    """오디오 파일명 규칙: '01. 한국제목.mp3' (한글 제목이 없으면 전체 제목)"""
+    num_str = str(lesson_obj["lesson"]).zfill(2)
+    title_en, title_ko = split_title(lesson_obj["title"])
+    return f"{num_str}. {title_ko or title_en}.mp3"
+
+
+SENTENCE_END = (".", "?", "!", "\"", "”", "’", ")")
+
+
+def split_sentences(text):
+    """줄 단위 문장 목록. PDF에서 줄바꿈으로 잘린 문장(끝에 마침표 없음)은 다음 줄과 합친다."""
+    sentences, pending = [], ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        pending = f"{pending} {line}" if pending else line
+        if pending.endswith(SENTENCE_END):
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        sentences.append(pending)
+    return sentences
+
+
+# lessons.json에 저장되는 원본 필드 / 저장소가 덧붙이는 파생 필드
+LESSON_FIELDS = ("lesson", "title", "english", "korean", "grammar", "practice")
+DERIVED_FIELDS = ("title_en", "title_ko", "audio_filename", "sentences")
+
+
+def lesson_to_dict(lesson_obj, derived=True):
+    """dict/LessonRecord 어느 쪽이든 JSON으로 내보낼 수 있는 dict로"""
+    fields = LESSON_FIELDS + DERIVED_FIELDS if derived else LESSON_FIELDS
+    return {k: list(v) if isinstance(v, tuple) else v for k, v in ((k, lesson_obj[k]) for k in fields)}
+
+
+def enrich_lesson(lesson_obj):
+    """원본 레슨 dict에 화면/PDF에서 반복 계산하던 필드를 미리 채워 넣는다."""
+    title_en, title_ko = split_title(lesson_obj["title"])
+    lesson_obj["title_en"] = title_en
+    lesson_obj["title_ko"] = title_ko
+    lesson_obj["audio_filename"] = audio_filename(lesson_obj)
+    lesson_obj["sentences"] = split_sentences(lesson_obj["english"])
+    # 화면/PDF 조각은 make_lessons_json.py가 미리 만들어 저장. 예전 파일이면 로드할 때 한 번 만듦
+    from lesson_render import has_fragments, build_fragments
+    if not has_fragments(lesson_obj):
+        lesson_obj["fragments"] = build_fragments(lesson_obj)
+    return lesson_obj
+
+
+# -------------------------------
+# 🔹 프로세스 공용 Lesson 저장소
+# -------------------------------
+class LessonStore:
+    """
+    lessons.json을 프로세스당 한 번만 읽어 두고 모든 세션이 공유하는 저장소.
+    - 파일의 (mtime, size)가 바뀌면 내용 해시를 비교해 필요할 때만 다시 파싱
+    - 레슨 번호로 O(1) 조회 (by_number)
+    """
+
+    def __init__(self, path=LESSONS_JSON):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._digest = None
+        self._lessons = []
+        self._by_number = {}
+        self._positions = {}
+        self._numbers = []
+
+    def _file_stamp(self):
+        try:
+            st_ = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st_.st_mtime_ns, st_.st_size)
+
+    def _reload(self, stamp):
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        if digest != self._digest:
+            incr("lessons_reloads")
+            with span("lessons.parse"):
+                lessons = [enrich_lesson(obj) for obj in json.loads(raw.decode("utf-8"))]
+            self._lessons = lessons
+            self._by_number = {obj["lesson"]: obj for obj in lessons}
+            self._positions = {obj["lesson"]: i for i, obj in enumerate(lessons)}
+            self._numbers = sorted(self._positions)
+            self._digest = digest
+        self._stamp = stamp
+
+    def refresh(self):
+        """파일이 바뀌었으면 다시 읽는다. 파일이 없으면 빈 목록."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            if stamp is None:
+                self._lessons, self._by_number, self._positions, self._numbers = [], {}, {}, []
+                self._stamp, self._digest = None, None
+                return
+            self._reload(stamp)
+
+    @property
+    def digest(self):
+        self.refresh()
+        return self._digest
+
+    def all(self):
+        self.refresh()
+        return self._lessons
+
+    def by_number(self, number):
+        self.refresh()
+        return self._by_number.get(number)
+
+    def position(self, number):
+        """레슨 번호 → all() 목록에서의 위치 (없으면 None)"""
+        self.refresh()
+        return self._positions.get(number)
+
+    def positions_between(self, first, last):
+        """first ≤ 번호 ≤ last인 Lesson들의 all() 위치 (번호순)"""
+        self.refresh()
+        numbers = self._numbers
+        lo, hi = bisect.bisect_left(numbers, first), bisect.bisect_right(numbers, last)
+        return [self._positions[n] for n in numbers[lo:hi]]
+
+    def __len__(self):
+        return len(self.all())
+
+    def __getitem__(self, index):
+        return self.all()[index]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def default_store_path():
+    """config.LESSON_STORE_FORMAT에 따라 lessons.json 또는 lessons.bin (bin이 아직 없으면 json)"""
+    if LESSON_STORE_FORMAT == "bin" and os.path.exists(LESSONS_BIN):
+        return LESSONS_BIN
+    return LESSONS_JSON
+
+
+def get_store(path=None):
+    """경로별로 하나의 저장소만 만들어 재사용 (.bin이면 mmap 저장소)"""
+    path = os.path.abspath(path or default_store_path())
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                if path.endswith(".bin"):
+                    from lesson_bin import MmapLessonStore
+                    store = MmapLessonStore(path)
+                else:
+                    store = LessonStore(path)
+                _stores[path] = store
+    return store
+
+
+def drop_store(path):
+    """저장소를 프로세스 캐시에서 내림 (courses.py의 메모리 한도 관리용)"""
+    with _stores_lock:
+        return _stores.pop(os.path.abspath(path), None) is not None
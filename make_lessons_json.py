@@ -1,30 +1,293 @@
+import os
 import json
 import re
+import hashlib
+import argparse
 import pdfplumber
-from config import SOURCE_PDF, LESSONS_JSON
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.pdftypes import resolve1, PDFObjRef, PDFStream
+from config import SOURCE_PDF, LESSONS_JSON, LESSONS_JSONL, LESSONS_BIN, PAGE_CACHE_DIR, PAGE_QUALITY_REPORT
+from lesson_bin import LessonBinWriter
+from lesson_render import build_fragments
+from page_quality import assess_page, check_day_sequence, best_fallback
+
+# 추출 방식이 바뀌면 이 값을 올려서 페이지 캐시를 무효화
+EXTRACTOR_VERSION = 2
+
+# 글꼴 사전을 따라 들어가는 최대 깊이 (순환 참조 방지)
+FONT_DEPTH = 6
+
+# 작업 프로세스 하나가 한 번에 처리할 페이지 수
+PAGES_PER_TASK = 8
 
 
 # -------------------------------
-# 📄 PDF 텍스트 추출 (pdfplumber 사용)
+# 📄 페이지 지문 (내용 스트림 + 글꼴 해시)
 # -------------------------------
-def extract_text(pdf_path):
-    text = []
+def _object_digest(obj, memo, depth=0):
+    """PDF 객체(사전·배열·스트림)를 내용 기준 해시로. 같은 참조는 memo로 한 번만 계산"""
+    if isinstance(obj, PDFObjRef):
+        if obj.objid not in memo:
+            memo[obj.objid] = "?"   # 계산 중 (순환 참조면 이 값을 씀)
+            memo[obj.objid] = _object_digest(obj.resolve(), memo, depth)
+        return memo[obj.objid]
+    if depth > FONT_DEPTH:
+        return "…"
+    if isinstance(obj, PDFStream):
+        attrs = _object_digest(obj.attrs, memo, depth + 1)
+        return hashlib.sha1(attrs.encode("utf-8") + obj.get_data()).hexdigest()
+    if isinstance(obj, dict):
+        items = (f"{k}={_object_digest(v, memo, depth + 1)}" for k, v in sorted(obj.items(), key=lambda kv: str(kv[0])))
+        return "{" + ",".join(items) + "}"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ",".join(_object_digest(v, memo, depth + 1) for v in obj) + "]"
+    return repr(obj)
+
+
+def page_fingerprint(page, memo=None):
+    """
+    페이지 내용 스트림 + 크기 + 글꼴 사전(ToUnicode CMap·인코딩 포함) + 추출기 버전으로 만든 해시.
+    글꼴 매핑이 바뀌면 같은 내용 스트림이라도 추출 텍스트가 달라지므로 함께 넣는다.
+    텍스트 추출 없이 빠르게 계산 (여러 페이지가 공유하는 글꼴은 memo로 한 번만 해시).
+    """
+    memo = {} if memo is None else memo
+    h = hashlib.sha1(f"v{EXTRACTOR_VERSION}|{tuple(page.mediabox)}".encode("ascii"))
+    for stream in page.page_obj.contents or []:
+        h.update(resolve1(stream).get_data())
+    fonts = resolve1((page.page_obj.resources or {}).get("Font")) or {}
+    h.update(_object_digest(fonts, memo).encode("utf-8"))
+    return h.hexdigest()
+
+
+def page_fingerprints(pdf_path):
+    memo = {}
     with pdfplumber.open(pdf_path) as pdf:
-        for i, page in enumerate(pdf.pages, 1):
-            page_text = page.extract_text() or ""
-            text.append(page_text)
-    return "\n".join(text)
+        return [page_fingerprint(page, memo) for page in pdf.pages]
+
+
+# -------------------------------
+# 📄 페이지 텍스트 캐시 (<원본 PDF별 폴더>/<지문>.txt + 품질 보고 <지문>.json)
+# -------------------------------
+def page_cache_dir(cache_root, pdf_path):
+    """원본 PDF마다 따로 쓰는 캐시 폴더 (코스마다 source.pdf처럼 같은 이름이어도 경로로 구분)"""
+    path = os.path.abspath(pdf_path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_root, f"{stem}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}")
+
+
+def _cache_path(cache_dir, digest, ext="txt"):
+    return os.path.join(cache_dir, f"{digest}.{ext}")
+
+
+def read_cached_page(cache_dir, digest):
+    try:
+        with open(_cache_path(cache_dir, digest), "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_cached_report(cache_dir, digest):
+    """페이지 품질 보고 (대체 추출을 이미 시도했는지 'tried' 포함). 없으면 None"""
+    try:
+        with open(_cache_path(cache_dir, digest, "json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_atomic(path, content):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+
+
+def write_cached_page(cache_dir, digest, text, report=None):
+    """
+    텍스트 + 품질 보고를 저장. 'missing_day'는 문서 전체를 보고 매번 다시 판정하므로
+    저장하지 않는다 (대체 추출을 시도했다는 사실만 'tried'에 남김).
+    """
+    if report is not None:
+        report = dict(report, issues=[x for x in report["issues"] if x != "missing_day"])
+        report.pop("expected_days", None)
+        _write_atomic(_cache_path(cache_dir, digest, "json"), json.dumps(report, ensure_ascii=False))
+    _write_atomic(_cache_path(cache_dir, digest), text)
+
+
+# -------------------------------
+# 📄 작업 프로세스: PDF는 프로세스당 한 번만 연다
+# -------------------------------
+_worker_pdf = None
+
+
+def _init_worker(pdf_path):
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(pdf_path)
+
+
+def _extract_pages(page_indexes):
+    """
+    페이지 텍스트 + 품질 보고. 빈 페이지·깨진 한글이면 그 자리에서 대체 추출기를 시도해
+    나은 결과를 쓰고, 시도한 문제는 'tried'에 남겨 캐시된 뒤로는 다시 시도하지 않는다.
+    """
+    results = []
+    for i in page_indexes:
+        page = _worker_pdf.pages[i]
+        text = page.extract_text() or ""
+        report = assess_page(i + 1, text)
+        if report["issues"]:
+            tried = list(report["issues"])
+            better = best_fallback(page, i + 1, report)
+            if better:
+                text, report = better
+                report["fixed"] = True
+            report["tried"] = tried
+        results.append((i, text, report))
+    return results
+
+
+def _fallback_pages(tasks):
+    """품질이 낮은 페이지를 대체 추출기로 다시 추출: [(페이지, (텍스트, 보고) 또는 None), ...]"""
+    return [(i, best_fallback(_worker_pdf.pages[i], i + 1, report)) for i, report in tasks]
+
+
+def _chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _run_extraction(pdf_path, tasks, jobs, func=_extract_pages):
+    """페이지 묶음(tasks)을 순서대로 func로 처리해 내보냄. 묶음이 하나뿐이면 풀 없이 처리"""
+    if jobs == 1 or len(tasks) <= 1:
+        _init_worker(pdf_path)
+        try:
+            for task in tasks:
+                yield func(task)
+        finally:
+            _worker_pdf.close()
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(pdf_path,)) as pool:
+        yield from pool.map(func, tasks)
+
+
+# -------------------------------
+# 📄 PDF 텍스트 추출 (pdfplumber 사용)
+# -------------------------------
+def iter_page_texts(pdf_path, jobs=None, cache_dir=PAGE_CACHE_DIR, digests=None, reports=None):
+    """
+    페이지 텍스트를 페이지 순서대로 하나씩 내보냄 (전체를 메모리에 모으지 않음).
+    - 캐시에 있는 페이지(같은 지문)는 캐시 파일에서 바로 읽음
+    - 나머지 페이지만 여러 프로세스에 나눠 추출(+ 빈 페이지·깨진 한글이면 대체 추출) 후 캐시에 저장
+    - reports(목록)를 넘기면 페이지별 품질 보고를 순서대로 채움 (텍스트는 담지 않는 작은 dict)
+    """
+    digests = digests or page_fingerprints(pdf_path)
+    if cache_dir:
+        cache_dir = page_cache_dir(cache_dir, pdf_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        missing = [i for i, d in enumerate(digests) if not os.path.exists(_cache_path(cache_dir, d))]
+    else:
+        missing = list(range(len(digests)))
+
+    extracted = iter(())
+    if missing:
+        print(f"📄 페이지 {len(missing)}/{len(digests)}개 추출 (나머지는 캐시 사용)")
+        chunks = _run_extraction(pdf_path, _chunks(missing, PAGES_PER_TASK), jobs)
+        extracted = (item for chunk in chunks for item in chunk)
+
+    missing_set = set(missing)
+    for i, digest in enumerate(digests):
+        if i in missing_set:
+            _, page_text, report = next(extracted)
+            if cache_dir:
+                write_cached_page(cache_dir, digest, page_text, report)
+        else:
+            page_text = read_cached_page(cache_dir, digest)
+            report = read_cached_report(cache_dir, digest) or assess_page(i + 1, page_text)
+        if reports is not None:
+            # 같은 내용의 페이지가 여러 곳에 있을 수 있으므로 쪽 번호는 현재 위치로
+            reports.append(dict(report, page=i + 1))
+        yield page_text
+
+
+def extract_pages(pdf_path, jobs=None, cache_dir=PAGE_CACHE_DIR):
+    return list(iter_page_texts(pdf_path, jobs, cache_dir))
+
+
+def extract_text(pdf_path, jobs=None, cache_dir=PAGE_CACHE_DIR):
+    return "\n".join(iter_page_texts(pdf_path, jobs, cache_dir))
+
+
+# -------------------------------
+# 🔍 페이지 품질 검사 + 대체 추출 (page_quality.py)
+# -------------------------------
+def recheck_missing_days(pdf_path, reports, digests, jobs=None, cache_dir=PAGE_CACHE_DIR):
+    """
+    2차 검사: 스트리밍 중 모은 페이지별 보고로 DAY 순서를 확인하고, 머리글이 빠진 것으로 보이는
+    페이지 중 아직 시도하지 않은 곳만 작업 프로세스에서 대체 추출한다 (텍스트는 캐시 파일에서 읽음).
+    시도 결과는 나아지지 않았더라도 캐시에 'tried'로 남겨 다음 실행에서 다시 하지 않는다.
+    고친 페이지가 있으면 True (Lesson을 캐시에서 다시 만들어야 함).
+    """
+    check_day_sequence(reports)
+    todo = [(i, r) for i, r in enumerate(reports) if "missing_day" in r["issues"] and "missing_day" not in r.get("tried", ())]
+    if not todo or not cache_dir:
+        return False
+    cache_dir = page_cache_dir(cache_dir, pdf_path)
+    print(f"🔍 DAY 머리글이 빠진 것으로 보이는 페이지 {len(todo)}개 다시 추출: {[i + 1 for i, _ in todo]}")
+    fixed = False
+    for chunk in _run_extraction(pdf_path, _chunks(todo, PAGES_PER_TASK), jobs, _fallback_pages):
+        for i, result in chunk:
+            tried = sorted(set(reports[i].get("tried", ())) | set(reports[i]["issues"]))
+            if result:
+                text, report = result
+                report["fixed"] = fixed = True
+            else:
+                text, report = read_cached_page(cache_dir, digests[i]), reports[i]
+            report["tried"] = tried
+            reports[i] = report
+            write_cached_page(cache_dir, digests[i], text, report)
+    if fixed:
+        # 고친 페이지로 DAY 순서를 다시 판정
+        for r in reports:
+            r["issues"] = [x for x in r["issues"] if x != "missing_day"]
+            r.pop("expected_days", None)
+        check_day_sequence(reports)
+    return fixed
+
+
+def report_quality(reports, pdf_path, report_path=PAGE_QUALITY_REPORT):
+    remaining = [r for r in reports if r["issues"]]
+    for r in remaining:
+        print(f"  ⚠️ {r['page']}쪽: {', '.join(r['issues'])} (글자 {r['chars']}, 깨짐 {r['garbled']:.1%}, {r['source']})")
+    if report_path:
+        save_quality_report(report_path, pdf_path, reports)
+    poor = sum(1 for r in reports if r.get("tried"))
+    fixed = sum(1 for r in reports if r.get("fixed"))
+    print(f"🔍 페이지 품질: {len(reports)}쪽 중 문제 {poor}쪽 → 대체 추출로 개선 {fixed}쪽, 남은 문제 {len(remaining)}쪽")
+
+
+def save_quality_report(path, pdf_path, reports):
+    data = {
+        "pdf": os.path.basename(pdf_path),
+        "pages": len(reports),
+        "fixed": sum(1 for r in reports if r.get("fixed")),
+        "problems": sum(1 for r in reports if r["issues"]),
+        "report": reports,
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
 
 
 # -------------------------------
 # 🔹 Lesson 구분 (DAY 01–30)
 # -------------------------------
+DAY_PATTERN = re.compile(r"DAY\s*(\d{1,2})\s*[—-]\s*(.+)")
+
+
 def split_lessons(full_text):
     """
     PDF 내 'DAY 01 — 제목' 또는 'DAY 01 - 제목' 패턴으로 레슨 분리
     """
-    pattern = r"DAY\s*(\d{1,2})\s*[—-]\s*(.+)"
-    matches = list(re.finditer(pattern, full_text))
+    matches = list(DAY_PATTERN.finditer(full_text))
     lessons = []
     for i, m in enumerate(matches):
         start = m.end()
@@ -36,26 +299,75 @@ def split_lessons(full_text):
     return lessons
 
 
+def iter_lessons(page_texts):
+    """
+    split_lessons의 스트리밍 버전: 페이지를 받는 대로 이어 붙이고,
+    다음 'DAY NN' 제목이 나타나 앞 Lesson이 닫히면 바로 (번호, 제목, 본문)을 내보냄.
+    버퍼에는 아직 닫히지 않은 Lesson 하나 분량만 남는다.
+    """
+    buf = ""
+    for n, page_text in enumerate(page_texts):
+        buf = page_text if n == 0 else f"{buf}\n{page_text}"
+        matches = list(DAY_PATTERN.finditer(buf))
+        for m, nxt in zip(matches, matches[1:]):
+            yield int(m.group(1)), m.group(2).strip(), buf[m.end():nxt.start()].strip()
+        if matches:
+            buf = buf[matches[-1].start():]
+        else:
+            # 첫 Lesson 이전(머리말 등)은 버리되, 페이지 끝에 걸친 'DAY' 조각만 남김
+            k = buf.rfind("DAY")
+            buf = buf[k:] if k >= 0 else ""
+    m = DAY_PATTERN.search(buf)
+    if m:
+        yield int(m.group(1)), m.group(2).strip(), buf[m.end():].strip()
+
+
+# -------------------------------
+# 🔹 섹션 라벨 (한 번만 컴파일)
+# -------------------------------
+# 줄 맨 앞의 라벨을 한 번의 match로 판별:
+# - english/korean/grammar/practice 그룹 → 해당 섹션 시작 (라벨 줄은 버림)
+# - label 그룹 → 섹션은 그대로 두고 라벨 줄만 버림 (영문 소제목 등)
+LABEL_LINE = re.compile(
+    r"\s*[|.\-·]*\s*(?:🗣|🇰🇷|💡|📝)?\s*(?:"
+    r"(?P<english>영어 문장)"
+    r"|(?P<korean>한국어 번역)"
+    r"|(?P<grammar>문법)"
+    r"|(?P<practice>말하기)"
+    r"|(?P<label>English Sentences?|Korean Translation|Grammar|표현 포인트|Speaking Practice|연습))",
+    re.I,
+)
+
+SECTION_KEYS = ("english", "korean", "grammar", "practice")
+
+# 목록 섹션(문법·연습)에서 새 항목의 시작으로 보는 글머리 기호
+BULLETS = ("•", "●", "▪", "◦")
+
+STRIP_CHARS = " \n\t|·"
+
+
 # -------------------------------
 # 🔹 텍스트 정리 함수 (소제목 제거)
 # -------------------------------
 def clean_text(text):
     if not text:
         return ""
-    # 불필요한 라벨 제거 (영문+한글)
-    text = re.sub(r"^\s*[|.\-·]*\s*(English Sentences?|영어 문장).*", "", text, flags=re.I | re.M)
-    text = re.sub(r"^\s*[|.\-·]*\s*(Korean Translation|한국어 번역).*", "", text, flags=re.I | re.M)
-    text = re.sub(r"^\s*[|.\-·]*\s*(Grammar.*|문법.*|표현 포인트.*)", "", text, flags=re.I | re.M)
-    text = re.sub(r"^\s*[|.\-·]*\s*(Speaking Practice|말하기 연습|연습).*", "", text, flags=re.I | re.M)
+    # 불필요한 라벨 줄 제거 (영문+한글)
+    lines = [line for line in text.splitlines() if not LABEL_LINE.match(line)]
     # 깨끗하게 정리
-    return text.strip(" \n\t|·")
+    return "\n".join(lines).strip(STRIP_CHARS)
 
 
 def clean_list(lst):
+    """줄 목록 → 항목 목록. 글머리 기호 없이 시작하는 줄은 앞 항목이 줄바꿈된 것으로 보고 이어 붙임"""
     cleaned = []
     for item in lst:
-        t = clean_text(item)
-        if t:
+        t = item.strip(STRIP_CHARS)
+        if not t or LABEL_LINE.match(t):
+            continue
+        if cleaned and cleaned[-1].startswith(BULLETS) and not t.startswith(BULLETS):
+            cleaned[-1] = f"{cleaned[-1]} {t}"
+        else:
             cleaned.append(t)
     return cleaned
 
@@ -65,66 +377,179 @@ def clean_list(lst):
 # -------------------------------
 def extract_sections(body_text):
     """
-    본문에서 네 섹션을 분리:
+    본문을 한 줄씩 한 번만 훑으며 네 섹션으로 분류:
     - 영어 문장
     - 한국어 번역
     - 문법·표현 포인트
     - 말하기 연습
+    라벨 줄은 섹션 전환에만 쓰고 버린다. 첫 라벨 이전 줄은 무시.
     """
-    labels = [
-        r"🗣\s*영어 문장.*?|영어 문장.*?",
-        r"🇰🇷\s*한국어 번역.*?|한국어 번역.*?",
-        r"💡\s*문법.*?|문법.*?",
-        r"📝\s*말하기.*?|말하기.*?"
-    ]
-
-    parts = re.split("(" + "|".join(labels) + ")", body_text)
-    def get_content(label_text):
-        try:
-            idx = next(i for i, t in enumerate(parts) if re.match(label_text, t or "", flags=re.I))
-            return parts[idx + 1].strip()
-        except StopIteration:
-            return ""
-
-    english = clean_text(get_content(labels[0]))
-    korean = clean_text(get_content(labels[1]))
-    grammar_raw = get_content(labels[2])
-    practice_raw = get_content(labels[3])
+    buckets = {key: [] for key in SECTION_KEYS}
+    current = None
+    for line in body_text.splitlines():
+        m = LABEL_LINE.match(line)
+        if m:
+            if m.lastgroup != "label":
+                current = m.lastgroup
+            continue
+        if current is not None:
+            buckets[current].append(line)
 
-    grammar = clean_list(grammar_raw.splitlines())
-    practice = clean_list(practice_raw.splitlines())
+    english = "\n".join(buckets["english"]).strip(STRIP_CHARS)
+    korean = "\n".join(buckets["korean"]).strip(STRIP_CHARS)
+    grammar = clean_list(buckets["grammar"])
+    practice = clean_list(buckets["practice"])
 
     return english, korean, grammar, practice
 
 
 # -------------------------------
-# 🔹 JSON 생성
+# 🔹 JSON 생성 (Lesson 단위 스트리밍)
 # -------------------------------
-def build_json(pdf_path, out_json):
-    text = extract_text(pdf_path)
-    blocks = split_lessons(text)
-    lessons = []
+def lesson_digest(lesson_obj):
+    raw = json.dumps(lesson_obj, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def existing_digests(out_json, out_jsonl=None):
+    """기존 결과의 {Lesson 번호: 해시}. JSONL이 있으면 한 줄씩 읽어 메모리를 아낀다."""
+    digests = {}
+    try:
+        if out_jsonl and os.path.exists(out_jsonl):
+            with open(out_jsonl, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        obj = json.loads(line)
+                        digests[obj["lesson"]] = lesson_digest(obj)
+        else:
+            with open(out_json, "r", encoding="utf-8") as f:
+                for obj in json.load(f):
+                    digests[obj["lesson"]] = lesson_digest(obj)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return digests
 
+
+def iter_lesson_objects(blocks):
     for num, title, body in blocks:
         english, korean, grammar, practice = extract_sections(body)
-        lessons.append({
+        lesson_obj = {
             "lesson": num,
             "title": title,
             "english": english,
             "korean": korean,
             "grammar": grammar,
             "practice": practice
-        })
+        }
+        # 화면(HTML)·PDF(ReportLab) 조각을 escape해서 함께 저장 → 앱은 요청마다 문자열을 만들지 않음
+        lesson_obj["fragments"] = build_fragments(lesson_obj)
+        yield lesson_obj
 
-    with open(out_json, "w", encoding="utf-8") as f:
-        json.dump(lessons, f, ensure_ascii=False, indent=2)
 
-    print(f"✅ lessons.json 생성 완료 ({len(lessons)}개 Lesson) → {out_json}")
+class LessonWriter:
+    """
+    Lesson을 하나씩 받아 lessons.json(기존 들여쓰기 배열 형식),
+    lessons.jsonl(한 줄에 Lesson 하나), lessons.bin(mmap용, lesson_bin.py)에 바로 기록.
+    임시 파일에 쓰고 commit()에서 교체.
+    """
+
+    def __init__(self, out_json, out_jsonl=None, out_bin=None):
+        self.targets = [p for p in (out_json, out_jsonl, out_bin) if p]
+        self._json = open(out_json + ".tmp", "w", encoding="utf-8")
+        self._jsonl = open(out_jsonl + ".tmp", "w", encoding="utf-8") if out_jsonl else None
+        self._bin = LessonBinWriter(out_bin + ".tmp") if out_bin else None
+        self.count = 0
+
+    def write(self, lesson_obj):
+        # json.dump(list, indent=2)와 같은 모양이 되도록 항목마다 2칸 들여쓰기
+        item = json.dumps(lesson_obj, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._json.write(("[\n  " if self.count == 0 else ",\n  ") + item)
+        if self._jsonl:
+            self._jsonl.write(json.dumps(lesson_obj, ensure_ascii=False) + "\n")
+        if self._bin:
+            self._bin.write(lesson_obj)
+        self.count += 1
+
+    def _close(self):
+        self._json.write("\n]" if self.count else "[]")
+        self._json.close()
+        if self._jsonl:
+            self._jsonl.close()
+
+    def commit(self):
+        self._close()
+        if self._bin:
+            self._bin.commit()
+        for path in self.targets:
+            os.replace(path + ".tmp", path)
+
+    def discard(self):
+        self._close()
+        if self._bin:
+            self._bin.discard()
+        for path in self.targets:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+
+
+def build_json(pdf_path, out_json, jobs=None, out_jsonl=LESSONS_JSONL, out_bin=LESSONS_BIN,
+               report_path=PAGE_QUALITY_REPORT):
+    old = existing_digests(out_json, out_jsonl)
+    digests = page_fingerprints(pdf_path)
+    while True:
+        seen, changed, reports = set(), [], []
+        pages = iter_page_texts(pdf_path, jobs, digests=digests, reports=reports)
+
+        writer = LessonWriter(out_json, out_jsonl, out_bin)
+        try:
+            for lesson_obj in iter_lesson_objects(iter_lessons(pages)):
+                writer.write(lesson_obj)
+                seen.add(lesson_obj["lesson"])
+                if old.get(lesson_obj["lesson"]) != lesson_digest(lesson_obj):
+                    changed.append(lesson_obj["lesson"])
+            # 빠진 DAY 머리글은 문서 전체를 봐야 알 수 있으므로 2차로 확인
+            refetched = recheck_missing_days(pdf_path, reports, digests, jobs)
+        except BaseException:
+            writer.discard()
+            raise
+        if not refetched:
+            break
+        # 고친 페이지로 다시 (모든 페이지가 캐시에 있어 추출 없이 빠름. 시도한 페이지는 다시 시도하지 않음)
+        writer.discard()
+        print("🔁 고친 페이지로 Lesson을 다시 만듭니다")
+    report_quality(reports, pdf_path, report_path)
+
+    # 기존 파일과 비교해 바뀐 Lesson이 있을 때만 교체
+    removed = sorted(set(old) - seen)
+    outputs_exist = all(os.path.exists(p) for p in writer.targets)
+    if old and outputs_exist and not changed and not removed:
+        writer.discard()
+        print(f"✅ 변경 없음 ({writer.count}개 Lesson) → {out_json}")
+        return writer.count
+
+    writer.commit()
+    if old:
+        print(f"🔁 변경된 Lesson: {changed or '-'} / 삭제된 Lesson: {removed or '-'}")
+    print(f"✅ lessons.json 생성 완료 ({writer.count}개 Lesson) → {out_json}")
+    return writer.count
 
 
 # -------------------------------
 # 🚀 실행 진입점
 # -------------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF → lessons.json 변환")
+    parser.add_argument("--jobs", type=int, default=None, help="추출 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--course", default=None, help="courses/<코스 id>/ 의 PDF → 그 폴더의 lessons.json (기본: 기본 코스)")
+    args = parser.parse_args()
+
     print("📘 PDF → JSON 변환 시작 (소제목 자동 제거 버전)")
-    build_json(SOURCE_PDF, LESSONS_JSON)
+    if args.course:
+        from courses import get_registry, load_course
+        from config import COURSES_DIR
+        course = get_registry().get(args.course) or load_course(args.course, os.path.join(COURSES_DIR, args.course))
+        base = os.path.splitext(course.lessons_json)[0]
+        build_json(course.source_pdf, course.lessons_json, args.jobs, base + ".jsonl", base + ".bin",
+                   os.path.join(course.root, "page_quality.json"))
+    else:
+        build_json(SOURCE_PDF, LESSONS_JSON, args.jobs)
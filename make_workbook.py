@@ -1,148 +1,151 @@
 import os
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from config import PDF_OUTPUT_DIR
-
-# 한글 폰트 등록
-pdfmetrics.registerFont(UnicodeCIDFont('HYSMyeongJo-Medium'))
-
-# PDF 파일 경로
-output_path = os.path.join(PDF_OUTPUT_DIR, "Day28_29_30.pdf")
-
-# 스타일 정의
-styles = getSampleStyleSheet()
-styles.add(ParagraphStyle(name='Unified',
-                          fontName='HYSMyeongJo-Medium',
-                          fontSize=12,
-                          leading=22,
-                          spaceAfter=14))
-styles.add(ParagraphStyle(name='HeadingUnified',
-                          fontName='HYSMyeongJo-Medium',
-                          fontSize=14,
-                          leading=26,
-                          spaceAfter=20))
-
-# 내용 구성
-content = []
-
-# DAY 28
-content.append(Paragraph("DAY 28 - Spending Time with Friends | 친구들과의 시간", styles['HeadingUnified']))
-
-content.append(Paragraph("영어 문장 | English Sentences", styles['HeadingUnified']))
-content.append(Paragraph("""These days, there isn't enough time to hang out with my friends.<br/>
-Everyone's schedule is tight, so we meet up once during the week or on weekends.<br/>
-We normally go to a coffee shop or have a drink.<br/>
-I don't love talking, but I am a good listener.<br/>
-However, it depends on the person.<br/>
-I don't want to listen to a person who only talks about themselves.""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("한국어 번역 | Korean Translation", styles['HeadingUnified']))
-content.append(Paragraph("""요즘에는 친구들과 어울려 다닐 시간이 별로 없습니다.<br/>
-다들 스케줄이 빡빡해서 주중이나 주말에 한 번 만나요.<br/>
-우리는 보통 커피숍에 가거나 술을 마십니다.<br/>
-저는 말하는 것을 좋아하지 않지만 남의 이야기는 잘 들어줍니다.<br/>
-하지만 그건 사람에 따라 달라요.<br/>
-자기 이야기만 하는 사람의 말은 듣고 싶지 않아요.""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("문법&middot;표현 포인트 | Grammar &amp; Expressions", styles['HeadingUnified']))
-content.append(Paragraph("""• hang out with friends → 친구들과 어울리다<br/>
-• be tight (schedule) → 일정이 빡빡하다<br/>
-• it depends on → ~에 따라 다르다<br/>
-• talk about oneself → 자기 이야기를 하다<br/>
-• be a good listener → 잘 들어주는 사람이다""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("말하기 연습 | Speaking Practice", styles['HeadingUnified']))
-content.append(Paragraph("""• 저는 친구들과 어울릴 시간이 별로 없어요. → I don’t have much time to hang out with my friends.<br/>
-• 주중이나 주말에 한 번 만나요. → We meet once during the week or on weekends.<br/>
-• 자기 이야기만 하는 사람은 싫어요. → I don’t like people who only talk about themselves.""", styles['Unified']))
-
-# 새 페이지
-content.append(PageBreak())
-
-# DAY 29
-content.append(Paragraph("DAY 29 - My Friend’s Birthday | 친구의 생일", styles['HeadingUnified']))
-
-content.append(Paragraph("영어 문장 | English Sentences", styles['HeadingUnified']))
-content.append(Paragraph("""It was Kim’s birthday yesterday.<br/>
-We had a birthday party at a restaurant in the neighborhood.<br/>
-The restaurant is a 10-minute walk from my house.<br/>
-I gave Kim a scented candle for her birthday present.<br/>
-She was satisfied with the present, and I was satisfied with my choice.<br/>
-We spent about three hours at the restaurant.<br/>
-We had a great time.""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("한국어 번역 | Korean Translation", styles['HeadingUnified']))
-content.append(Paragraph("""어제는 Kim의 생일이었어요.<br/>
-우리는 동네 식당에서 생일 파티를 했어요.<br/>
-그 식당은 우리 집에서 걸어서 10분 거리입니다.<br/>
-저는 Kim에게 생일 선물로 향초를 줬어요.<br/>
-Kim은 선물에 만족했고 저도 제 선택에 만족했어요.<br/>
-우리는 세 시간 정도 식당에 있었고 즐거운 시간을 보냈어요.""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("문법&middot;표현 포인트 | Grammar &amp; Expressions", styles['HeadingUnified']))
-content.append(Paragraph("""• birthday present → 생일 선물<br/>
-• be satisfied with → ~에 만족하다<br/>
-• a 10-minute walk → 도보로 10분 거리<br/>
-• spend time → 시간을 보내다<br/>
-• have a great time → 즐거운 시간을 보내다""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("말하기 연습 | Speaking Practice", styles['HeadingUnified']))
-content.append(Paragraph("""• 어제는 Kim의 생일이었어요. → It was Kim’s birthday yesterday.<br/>
-• 향초를 선물했어요. → I gave her a scented candle.<br/>
-• 우리는 즐거운 시간을 보냈어요. → We had a great time.""", styles['Unified']))
-
-# 새 페이지
-content.append(PageBreak())
-
-# DAY 30
-content.append(Paragraph("DAY 30 - A Conversation with a Friend | 친구와의 대화", styles['HeadingUnified']))
-
-content.append(Paragraph("영어 문장 | English Sentences", styles['HeadingUnified']))
-content.append(Paragraph("""On the way back home, Kim and I went to the park behind her house.<br/>
-We sat on a bench and had a talk.<br/>
-I was a bit tired, but I listened to Kim.<br/>
-She talked about some issues with her boss.<br/>
-I told her that it is complicated to solve these problems, but it wouldn’t take too much time.<br/>
-When I got home, it was 11:30 p.m.<br/>
-I got ready for bed and went to sleep at midnight.""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("한국어 번역 | Korean Translation", styles['HeadingUnified']))
-content.append(Paragraph("""집에 오는 길에 Kim과 저는 Kim의 집 뒤 공원에 갔습니다.<br/>
-우리는 벤치에 앉아 대화를 나눴습니다.<br/>
-저는 조금 피곤했지만 Kim의 이야기를 들어줬습니다.<br/>
-Kim은 직장 상사와의 문제에 대해 이야기했어요.<br/>
-저는 그런 문제는 복잡하지만 오래 걸리지는 않을 거라고 말했습니다.<br/>
-집에 도착했을 때는 밤 11시 30분이었어요.<br/>
-잘 준비를 하고 자정에 잠이 들었습니다.""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("문법&middot;표현 포인트 | Grammar &amp; Expressions", styles['HeadingUnified']))
-content.append(Paragraph("""• on the way back home → 집에 오는 길에<br/>
-• have a talk → 대화를 나누다<br/>
-• talk about → ~에 대해 이야기하다<br/>
-• get ready for bed → 잠잘 준비를 하다<br/>
-• go to sleep → 잠이 들다""", styles['Unified']))
-content.append(Spacer(1, 16))
-
-content.append(Paragraph("말하기 연습 | Speaking Practice", styles['HeadingUnified']))
-content.append(Paragraph("""• 우리는 공원 벤치에 앉아 이야기했어요. → We sat on a bench and had a talk.<br/>
-• Kim은 상사 문제에 대해 얘기했어요. → Kim talked about issues with her boss.<br/>
-• 저는 자정에 잠이 들었어요. → I went to sleep at midnight.""", styles['Unified']))
-
-# PDF 생성
-doc = SimpleDocTemplate(output_path, pagesize=A4,
-                        rightMargin=72, leftMargin=72,
-                        topMargin=72, bottomMargin=72)
-doc.build(content)
-
-print(f"PDF 파일 생성 완료: {output_path}")
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import LESSONS_JSON, PDF_OUTPUT_DIR
+from lesson_store import enrich_lesson
+from worksheet import create_pdf_buffer, create_workbook_buffer, lesson_pdf_key, workbook_key
+
+# 출력 폴더의 "파일명 → 내용 키" 기록 (변경 없는 Lesson은 다시 만들지 않음)
+MANIFEST_NAME = "workbook_manifest.json"
+
+
+# -------------------------------
+# 🔹 Lesson 선택 ("1-30", "3,5,7", "1-5,10")
+# -------------------------------
+def parse_selection(spec):
+    """선택한 Lesson 번호 집합. 빈 문자열이면 None(전체). "5-3"처럼 거꾸로 쓴 범위는 뒤집어서 처리"""
+    if not spec.strip():
+        return None
+    numbers = set()
+    try:
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                start, end = sorted(int(n) for n in part.split("-", 1))
+                numbers.update(range(start, end + 1))
+            else:
+                numbers.add(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'Lesson 선택을 읽을 수 없습니다: "{spec}" (예: "1-30", "3,5,7")')
+    return numbers
+
+
+def load_selected_lessons(json_path, selection=None):
+    with open(json_path, "r", encoding="utf-8") as f:
+        lessons = json.load(f)
+    if selection is not None:
+        lessons = [l for l in lessons if l["lesson"] in selection]
+    # 저장된 화면/PDF 조각이 내용과 맞는지는 여기서 한 번만 확인 (손으로 고친 lessons.json 대비)
+    return sorted((enrich_lesson(l) for l in lessons), key=lambda l: l["lesson"])
+
+
+# -------------------------------
+# 🔹 출력 기록 (manifest)
+# -------------------------------
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def is_up_to_date(out_dir, manifest, file_name, key):
+    return manifest.get(file_name) == key and os.path.exists(os.path.join(out_dir, file_name))
+
+
+# -------------------------------
+# 🔹 작업 단위 (프로세스 풀에서 실행)
+# -------------------------------
+def _write(path, data):
+    with open(path + ".tmp", "wb") as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def render_lesson(lesson_obj, path):
+    _write(path, create_pdf_buffer(lesson_obj).getvalue())
+    return path
+
+
+def render_workbook(lesson_objs, path):
+    _write(path, create_workbook_buffer(lesson_objs).getvalue())
+    return path
+
+
+# -------------------------------
+# 🔹 일괄 생성
+# -------------------------------
+def build_workbooks(lessons, out_dir=PDF_OUTPUT_DIR, jobs=None, combined=True, force=False):
+    """
+    Lesson별 PDF(Lesson_NN.pdf)와 합본(Workbook_AA-BB.pdf)을 프로세스 풀로 병렬 생성.
+    이미 같은 내용으로 만들어진 파일은 건너뛴다 (force=True면 모두 다시 생성).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(out_dir)
+
+    tasks = []  # (파일명, 키, 함수, 인자)
+    for lesson_obj in lessons:
+        name = f"Lesson_{lesson_obj['lesson']:02d}.pdf"
+        tasks.append((name, lesson_pdf_key(lesson_obj), render_lesson, lesson_obj))
+    if combined and lessons:
+        name = f"Workbook_{lessons[0]['lesson']:02d}-{lessons[-1]['lesson']:02d}.pdf"
+        tasks.append((name, workbook_key(lessons), render_workbook, lessons))
+
+    todo = [t for t in tasks if not is_up_to_date(out_dir, manifest, t[0], t[1])]
+    skipped = len(tasks) - len(todo)
+    if skipped:
+        print(f"⏩ 변경 없음 {skipped}개 건너뜀")
+    if not todo:
+        print("✅ 모든 PDF가 최신 상태입니다.")
+        return manifest
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(func, arg, os.path.join(out_dir, name)): (name, key)
+            for name, key, func, arg in todo
+        }
+        for fut in as_completed(futures):
+            name, key = futures[fut]
+            done += 1
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"[{done}/{len(todo)}] ❌ {name}: {e}")
+                continue
+            manifest[name] = key
+            print(f"[{done}/{len(todo)}] ✅ {name}")
+
+    save_manifest(out_dir, manifest)
+    return manifest
+
+
+# -------------------------------
+# 🚀 실행 진입점
+# -------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="lessons.json → 학습지 PDF 일괄 생성")
+    parser.add_argument("--lessons", default=None, type=parse_selection, help='생성할 Lesson (예: "1-30", "3,5,7"). 기본: 전체')
+    parser.add_argument("--json", default=LESSONS_JSON, help="입력 lessons.json 경로")
+    parser.add_argument("--out", default=PDF_OUTPUT_DIR, help="출력 폴더")
+    parser.add_argument("--jobs", type=int, default=None, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--no-combined", action="store_true", help="합본 워크북 생략")
+    parser.add_argument("--force", action="store_true", help="최신 상태여도 모두 다시 생성")
+    args = parser.parse_args()
+
+    selected = load_selected_lessons(args.json, args.lessons)
+    if not selected:
+        parser.error(f"--lessons로 선택한 Lesson이 {args.json}에 없습니다")
+    print(f"📘 학습지 PDF 생성 시작 ({len(selected)}개 Lesson) → {args.out}")
+    build_workbooks(selected, args.out, args.jobs, combined=not args.no_combined, force=args.force)
@@ -0,0 +1,274 @@
+import os
+import re
+import sys
+import errno
+import threading
+import http.client
+from urllib.parse import urlsplit, unquote, quote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import MEDIA_HOST, MEDIA_PORT, MEDIA_PUBLIC_URL, DEFAULT_COURSE
+from courses import get_registry, get_course
+from metrics import prometheus_text
+
+AUDIO_MIME = {
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".wav": "audio/wav",
+    ".ogg": "audio/ogg",
+}
+
+# 오디오는 거의 바뀌지 않으므로 브라우저 캐시 + ETag 재검증
+AUDIO_CACHE_CONTROL = "public, max-age=86400"
+
+RANGE_HEADER = re.compile(r"bytes=(\d*)-(\d*)")
+# /courses/<코스 id>/... → 해당 코스, 접두어가 없으면 기본 코스
+COURSE_PREFIX = re.compile(r"/courses/([^/]+)(/.*)?")
+
+
+# -------------------------------
+# 🔹 HTTP 도우미
+# -------------------------------
+def file_etag(st_):
+    return f'"{st_.st_size:x}-{st_.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """
+    'bytes=start-end' 한 구간만 지원. 반환값:
+    - None: Range 없음/여러 구간/문법에 맞지 않는 구간(예: bytes=500-100) → 무시하고 전체 전송 (RFC 9110)
+    - (start, end): 포함 구간
+    - False: 문법은 맞지만 만족할 수 없는 구간 (416)
+    """
+    if not header or "," in header:
+        return None
+    m = RANGE_HEADER.fullmatch(header.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    if m.group(1):
+        start = int(m.group(1))
+        if m.group(2) and int(m.group(2)) < start:
+            return None
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        # 'bytes=-N' → 마지막 N바이트
+        length = int(m.group(2))
+        if length == 0:
+            return False
+        start, end = max(size - length, 0), size - 1
+    if start >= size:
+        return False
+    return start, end
+
+
+class MediaHandler(BaseHTTPRequestHandler):
+    """
+    GET/HEAD [/courses/<코스>]/audio/<lesson 번호>, GET /metrics (Prometheus 텍스트)
+    - Range 요청은 필요한 구간만 206으로 전송 (탐색·구간 반복 재생)
+    - ETag/Last-Modified로 304 응답 → 반복 재생은 브라우저 캐시 사용
+    """
+
+    server_version = "SpeakingMatrix"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.do_GET(head_only=True)
+
+    def resolve_course(self, path):
+        """(코스, 나머지 경로). 없는 코스면 (None, path)"""
+        m = COURSE_PREFIX.fullmatch(path)
+        if not m:
+            return get_course(), path
+        return get_registry().get(m.group(1)), m.group(2) or ""
+
+    def do_GET(self, head_only=False):
+        path = unquote(urlsplit(self.path).path)
+        if path == "/metrics":
+            # Prometheus 수집용 (이 프로세스의 구간 시간·캐시 적중)
+            data = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            if not head_only:
+                self.wfile.write(data)
+            return
+        course, path = self.resolve_course(path)
+        m = re.fullmatch(r"/audio/(\d+)", path)
+        if not m or course is None:
+            return self.send_error(404)
+        lesson_obj = course.store.by_number(int(m.group(1)))
+        audio_path = course.audio_index.lookup(lesson_obj) if lesson_obj else None
+        if not audio_path:
+            return self.send_error(404)
+        mime = AUDIO_MIME.get(os.path.splitext(audio_path)[1].lower(), "application/octet-stream")
+        self.send_file(audio_path, mime, AUDIO_CACHE_CONTROL, head_only)
+
+    def send_bytes(self, data, content_type, etag, cache_control, head_only=False, headers=None):
+        """메모리의 응답(JSON·PDF 등)을 ETag와 함께 전송. If-None-Match가 같으면 304"""
+        etag = f'"{etag}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head_only:
+            self.wfile.write(data)
+
+    def send_stream(self, chunks, content_type, etag, cache_control, head_only=False, headers=None):
+        """만들어지는 대로 chunked 전송 (전체 크기를 미리 모르는 zip·합본 PDF)"""
+        etag = f'"{etag}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", cache_control)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", cache_control)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        # HEAD도 GET과 같은 헤더 (크기를 모르므로 Content-Length 없이 chunked). 본문은 만들지 않음
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        if head_only:
+            return
+        try:
+            for chunk in chunks:
+                if chunk:
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def send_file(self, file_path, content_type, cache_control, head_only=False):
+        try:
+            f = open(file_path, "rb")
+        except OSError:
+            return self.send_error(404)
+        with f:
+            st_ = os.fstat(f.fileno())
+            size, etag = st_.st_size, file_etag(st_)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", cache_control)
+                self.end_headers()
+                return
+
+            byte_range = parse_range(self.headers.get("Range"), size)
+            if_range = self.headers.get("If-Range")
+            if if_range and if_range != etag:
+                byte_range = None
+            if byte_range is False:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            start, end = byte_range or (0, size - 1)
+            length = end - start + 1 if size else 0
+            self.send_response(206 if byte_range else 200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(length))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", self.date_time_string(st_.st_mtime))
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            if byte_range:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if head_only or not length:
+                return
+            self.wfile.flush()
+            try:
+                # 가능하면 sendfile로 커널에서 바로 전송 (파일 전체를 메모리에 올리지 않음)
+                self.connection.sendfile(f, start, length)
+            except (BrokenPipeError, ConnectionResetError):
+                # 탐색 중 브라우저가 연결을 끊는 것은 정상
+                self.close_connection = True
+
+
+# -------------------------------
+# 🔹 프로세스당 서버 1개 (백그라운드 스레드)
+# -------------------------------
+_server = None
+_server_lock = threading.Lock()
+
+
+def _is_media_server(host, port):
+    """이미 포트를 쓰고 있는 프로세스가 이 앱의 미디어 서버인지 (Server 헤더로 확인)"""
+    probe_host = "127.0.0.1" if host in ("", "0.0.0.0") else host
+    conn = http.client.HTTPConnection(probe_host, port, timeout=1)
+    try:
+        conn.request("HEAD", "/metrics")
+        return conn.getresponse().getheader("Server", "").startswith(MediaHandler.server_version)
+    except OSError:
+        return False
+    finally:
+        conn.close()
+
+
+def ensure_media_server(handler=MediaHandler, host=MEDIA_HOST, port=MEDIA_PORT):
+    """
+    서버가 없으면 데몬 스레드로 시작. 같은 포트를 다른 프로세스가 이미 쓰고 있으면
+    그 프로세스가 이 앱의 미디어 서버(다른 Streamlit 작업자 등)인지 확인하고 그대로 사용한다.
+    아니면 경고를 남긴다 (오디오 URL이 다른 서버로 가므로 MEDIA_PORT를 바꿔야 함).
+    """
+    global _server
+    if _server is not None:
+        return _server
+    with _server_lock:
+        if _server is None:
+            try:
+                server = ThreadingHTTPServer((host, port), handler)
+            except OSError as e:
+                if e.errno != errno.EADDRINUSE:
+                    raise
+                if not _is_media_server(host, port):
+                    print(f"⚠️ 포트 {port}를 다른 프로그램이 쓰고 있어 오디오 서버를 시작하지 못했습니다 "
+                          f"(config.py의 MEDIA_PORT를 바꾸세요)", file=sys.stderr, flush=True)
+                _server = False
+                return _server
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="media-server", daemon=True).start()
+            _server = server
+    return _server
+
+
+def media_base_url():
+    return (MEDIA_PUBLIC_URL or f"http://localhost:{MEDIA_PORT}").rstrip("/")
+
+
+def audio_url(lesson_obj, course_id=DEFAULT_COURSE):
+    """브라우저가 직접 요청할 오디오 URL (서버는 필요할 때 자동 시작)"""
+    ensure_media_server()
+    prefix = "" if course_id == DEFAULT_COURSE else f"/courses/{quote(course_id)}"
+    return f"{media_base_url()}{prefix}/audio/{lesson_obj['lesson']}"
+
+
+# -------------------------------
+# 🚀 실행 진입점: 오디오 서버만 단독 실행
+# -------------------------------
+if __name__ == "__main__":
+    server = ThreadingHTTPServer((MEDIA_HOST, MEDIA_PORT), MediaHandler)
+    print(f"🎧 오디오 서버 시작: http://{MEDIA_HOST}:{MEDIA_PORT}/audio/<lesson>")
+    server.serve_forever()
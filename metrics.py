@@ -0,0 +1,241 @@
+import sys
+import time
+import threading
+from collections import deque
+from config import METRICS_ENABLED, METRICS_LOG_INTERVAL
+
+# 구간별로 보관할 최근 측정값 수 (p50/p99 계산용)
+SAMPLE_WINDOW = 512
+
+PROM_PREFIX = "speaking_matrix"
+
+
+# -------------------------------
+# 🔹 측정값 저장소 (프로세스 공용)
+# -------------------------------
+class _Timer:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.samples.append(ms)
+
+
+_enabled = METRICS_ENABLED
+_lock = threading.Lock()
+_timers = {}        # 구간 이름 → _Timer
+_counters = {}      # (이름, 캐시) → 횟수
+_local = threading.local()
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    """벤치마크 등에서 켜고 끄기 (기본값은 config.METRICS_ENABLED)"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def record(name, ms):
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = _Timer()
+        timer.add(ms)
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans.append((name, ms))
+
+
+def incr(name, label="", n=1):
+    if not _enabled:
+        return
+    key = (name, label)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def hit(cache):
+    incr("cache_hits", cache)
+
+
+def miss(cache):
+    incr("cache_misses", cache)
+
+
+# -------------------------------
+# 🔹 구간 측정 (꺼져 있으면 아무것도 하지 않는 객체를 돌려줌)
+# -------------------------------
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name):
+    """with span("pdf.build"): ... — 걸린 시간(ms)을 구간 이름별로 누적"""
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name):
+    """함수 전체를 span으로 감싸는 데코레이터"""
+    def decorate(func):
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorate
+
+
+# -------------------------------
+# 🔹 Streamlit rerun 단위 기록 (스크립트 스레드별)
+# -------------------------------
+def begin_rerun():
+    if _enabled:
+        _local.spans = []
+        _local.rerun_start = time.perf_counter()
+
+
+def end_rerun():
+    """이번 rerun 전체 시간을 기록하고 [(구간, ms), ...]를 돌려줌"""
+    spans = getattr(_local, "spans", None)
+    if spans is None:
+        return []
+    _local.spans = None
+    record("rerun", (time.perf_counter() - _local.rerun_start) * 1000)
+    return spans
+
+
+# -------------------------------
+# 🔹 내보내기: dict / Prometheus 텍스트 / 로그 한 줄
+# -------------------------------
+def _percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+def snapshot():
+    with _lock:
+        timers = {name: (t.count, t.total, t.max, sorted(t.samples)) for name, t in _timers.items()}
+        counters = dict(_counters)
+    caches = {}
+    for (name, cache), n in counters.items():
+        if name in ("cache_hits", "cache_misses"):
+            caches.setdefault(cache, {"hits": 0, "misses": 0})[name[6:]] = n
+    for stats in caches.values():
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / total if total else 0.0
+    return {
+        "timers": {
+            name: {
+                "count": count,
+                "total_ms": total,
+                "max_ms": peak,
+                "p50_ms": _percentile(samples, 50),
+                "p99_ms": _percentile(samples, 99),
+            }
+            for name, (count, total, peak, samples) in sorted(timers.items())
+        },
+        "caches": dict(sorted(caches.items())),
+        "counters": {f"{n}{'/' + c if c else ''}": v for (n, c), v in sorted(counters.items())},
+    }
+
+
+def prometheus_text():
+    snap = snapshot()
+    lines = [
+        f"# HELP {PROM_PREFIX}_span_seconds 구간별 소요 시간 (최근 {SAMPLE_WINDOW}개 기준 분위수)",
+        f"# TYPE {PROM_PREFIX}_span_seconds summary",
+    ]
+    for name, t in snap["timers"].items():
+        label = f'span="{name}"'
+        lines.append(f'{PROM_PREFIX}_span_seconds{{{label},quantile="0.5"}} {t["p50_ms"] / 1000:.6f}')
+        lines.append(f'{PROM_PREFIX}_span_seconds{{{label},quantile="0.99"}} {t["p99_ms"] / 1000:.6f}')
+        lines.append(f"{PROM_PREFIX}_span_seconds_sum{{{label}}} {t['total_ms'] / 1000:.6f}")
+        lines.append(f"{PROM_PREFIX}_span_seconds_count{{{label}}} {t['count']}")
+    with _lock:
+        counters = sorted(_counters.items())
+    seen = set()
+    for (name, cache), n in counters:
+        metric = f"{PROM_PREFIX}_{name}_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        label = f'{{cache="{cache}"}}' if cache else ""
+        lines.append(f"{metric}{label} {n}")
+    return "\n".join(lines) + "\n"
+
+
+def summary_line():
+    snap = snapshot()
+    parts = [
+        f"{name} n={t['count']} p50={t['p50_ms']:.1f}ms p99={t['p99_ms']:.1f}ms"
+        for name, t in snap["timers"].items()
+    ]
+    parts += [
+        f"{cache} {s['hits']}/{s['hits'] + s['misses']} hit"
+        for cache, s in snap["caches"].items()
+    ]
+    return "📊 metrics | " + " | ".join(parts) if parts else "📊 metrics | (측정값 없음)"
+
+
+_log_thread = None
+_log_lock = threading.Lock()
+
+
+def start_log_thread(interval=METRICS_LOG_INTERVAL, stream=None):
+    """interval초마다 summary_line()을 stderr에 출력 (0이면 출력 안 함, 프로세스당 1개)"""
+    global _log_thread
+    if not interval or not _enabled or _log_thread is not None:
+        return _log_thread
+    with _log_lock:
+        if _log_thread is None:
+            def loop():
+                while True:
+                    time.sleep(interval)
+                    print(f"{time.strftime('%H:%M:%S')} {summary_line()}", file=stream or sys.stderr, flush=True)
+            _log_thread = threading.Thread(target=loop, name="metrics-log", daemon=True)
+            _log_thread.start()
+    return _log_thread
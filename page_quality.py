@@ -0,0 +1,152 @@
+import re
+
+# 이보다 글자가 적으면 빈 페이지로 봄 (스캔 이미지·추출 실패)
+MIN_PAGE_CHARS = 20
+
+# 깨진 글자 비율이 이보다 크면 다시 추출
+GARBLED_RATIO = 0.05
+
+# OCR (선택: pip install pytesseract + tesseract 설치, 한국어 데이터 kor)
+OCR_DPI = 300
+OCR_LANG = "kor+eng"
+
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+DAY_HEADER = re.compile(r"DAY\s*(\d{1,2})\s*[—-]")
+LAYOUT_SPACES = re.compile(r"[ \t]+")
+
+
+# -------------------------------
+# 🔹 페이지 품질 판정
+# -------------------------------
+def _is_garbled_char(c):
+    code = ord(c)
+    return (
+        c == "�"                       # 대체 문자
+        or 0xE000 <= code <= 0xF8FF         # 사용자 정의 영역 (폰트 매핑 실패)
+        or 0x3130 <= code <= 0x318F         # 호환 자모 (ㅎㅏㄴ처럼 풀어진 한글)
+        or 0x1100 <= code <= 0x11FF         # 조합형 자모 (NFC로 합쳐지지 않은 한글)
+        or (code < 0x20 and c not in "\n\t")
+    )
+
+
+def garbled_ratio(text):
+    """공백 제외 글자 중 깨진 글자 비율 ('(cid:123)' 조각은 통째로 깨진 것으로 셈)"""
+    cid_chars = sum(len(m) for m in CID_PATTERN.findall(text))
+    text = CID_PATTERN.sub("", text)
+    chars = [c for c in text if not c.isspace()]
+    total = len(chars) + cid_chars
+    if not total:
+        return 0.0
+    return (cid_chars + sum(1 for c in chars if _is_garbled_char(c))) / total
+
+
+def assess_page(page_no, text):
+    """페이지 하나의 품질 보고 (issues가 비어 있으면 정상)"""
+    chars = len(text.strip())
+    ratio = garbled_ratio(text)
+    issues = []
+    if chars < MIN_PAGE_CHARS:
+        issues.append("empty")
+    if ratio > GARBLED_RATIO:
+        issues.append("garbled")
+    return {
+        "page": page_no,
+        "chars": chars,
+        "garbled": round(ratio, 4),
+        "days": [int(d) for d in DAY_HEADER.findall(text)],
+        "issues": issues,
+        "source": "pdfplumber",
+    }
+
+
+def check_day_sequence(reports):
+    """
+    DAY 번호가 건너뛴 곳(예: DAY 01 다음이 DAY 03)의 사이 페이지에 'missing_day' 표시.
+    사이 페이지가 없으면 두 번째 DAY가 있는 페이지에 표시 (같은 페이지에 있어야 할 머리글이 빠진 경우).
+    """
+    found = [(r["page"], d) for r in reports for d in r["days"]]
+    for (page_a, day_a), (page_b, day_b) in zip(found, found[1:]):
+        if day_b <= day_a + 1:
+            continue
+        suspects = [r for r in reports if page_a < r["page"] < page_b] or [r for r in reports if r["page"] == page_b]
+        for r in suspects:
+            if "missing_day" not in r["issues"]:
+                r["issues"].append("missing_day")
+                r.setdefault("expected_days", list(range(day_a + 1, day_b)))
+    return reports
+
+
+def quality_key(report):
+    """여러 추출 결과 중 고를 때의 기준 (작을수록 좋음)"""
+    return (len(report["issues"]), report["garbled"], -report["chars"])
+
+
+# -------------------------------
+# 🔹 대체 추출기 (pdfplumber 페이지 객체를 받음, 작업 프로세스에서 실행)
+# -------------------------------
+def words_text(page):
+    """글자 흐름 순서의 단어를 줄 단위로 다시 묶음 (기본 추출이 줄 순서를 잃은 페이지)"""
+    words = page.extract_words(use_text_flow=True, x_tolerance=1.5, y_tolerance=3)
+    lines, last_top = [], None
+    for w in words:
+        if last_top is None or abs(w["top"] - last_top) > 3:
+            lines.append([])
+            last_top = w["top"]
+        lines[-1].append(w["text"])
+    return "\n".join(" ".join(line) for line in lines)
+
+
+def layout_text(page):
+    """배치 기준 추출 (글자 간격이 넓은 페이지) 후 공백 정리"""
+    text = page.extract_text(layout=True) or ""
+    lines = (LAYOUT_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def ocr_text(page):
+    """스캔 페이지용 OCR. pytesseract/tesseract가 없으면 None"""
+    try:
+        import pytesseract
+    except ImportError:
+        return None
+    try:
+        image = page.to_image(resolution=OCR_DPI).original
+        return pytesseract.image_to_string(image, lang=OCR_LANG)
+    except Exception:
+        # tesseract 실행 파일·언어 데이터가 없거나 렌더링 실패 → OCR 없이 진행
+        return None
+
+
+FALLBACK_EXTRACTORS = (("words", words_text), ("layout", layout_text), ("ocr", ocr_text))
+
+
+def best_fallback(page, page_no, report):
+    """
+    대체 추출기를 차례로 시도해 원래 결과보다 나은 것이 있으면 (텍스트, 보고)를, 없으면 None.
+    문제가 모두 해결되면 더 비싼 추출기(OCR)는 건너뜀.
+    'missing_day'는 문서 전체를 봐야 알 수 있으므로 여기서는 DAY 머리글이 생겼는지로 판단.
+    """
+    expected = report.get("expected_days")
+    best = None
+    baseline = _rescore(report, report["days"], expected)
+    for source, extract in FALLBACK_EXTRACTORS:
+        text = extract(page)
+        if not text:
+            continue
+        candidate = assess_page(page_no, text)
+        candidate["source"] = source
+        candidate = _rescore(candidate, candidate["days"], expected)
+        if quality_key(candidate) < quality_key(best[1] if best else baseline):
+            best = (text, candidate)
+            if not candidate["issues"]:
+                break
+    return best
+
+
+def _rescore(report, days, expected):
+    """기대한 DAY 머리글이 여전히 없으면 'missing_day'를 유지"""
+    report = dict(report, issues=[i for i in report["issues"] if i != "missing_day"])
+    if expected and not set(days) & set(expected):
+        report["issues"].append("missing_day")
+        report["expected_days"] = expected
+    return report
@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from config import PDF_CACHE_DIR, PDF_CACHE_SIZE, PDF_DISK_CACHE, WORKBOOK_CACHE_DIR, WORKBOOK_CACHE_MB
+from worksheet import lesson_pdf_key
+from metrics import hit, miss, incr
+
+
+# -------------------------------
+# 🔹 학습지 PDF 캐시 (메모리 LRU + 디스크)
+# -------------------------------
+class PdfCache:
+    """
+    레슨 내용 해시(lesson_pdf_key)를 키로 생성된 PDF 바이트를 보관한다.
+    - 1단계: 프로세스 메모리 LRU (최대 max_items개)
+    - 2단계: disk_dir 아래 '<키>.pdf' 파일 (disk_dir=None이면 사용 안 함)
+    zip 내보내기처럼 Lesson을 한꺼번에 훑을 때는 remember=False로 메모리 LRU를 밀어내지 않는다.
+    """
+
+    def __init__(self, max_items=PDF_CACHE_SIZE, disk_dir=None):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def get(self, key, remember=True):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                hit("pdf")
+                incr("pdf_cache_tier", "memory")
+                return data
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            if data:
+                self.disk_hits += 1
+                # 적중률은 두 단계를 합쳐 "pdf" 하나로, 단계별 내역은 별도 카운터로
+                hit("pdf")
+                incr("pdf_cache_tier", "disk")
+                if remember:
+                    self._remember(key, data)
+                return data
+        return None
+
+    def put(self, key, data, remember=True):
+        if remember:
+            self._remember(key, data)
+        if self.disk_dir:
+            # 임시 파일에 쓰고 교체 → 동시에 읽는 세션이 반쯤 쓴 파일을 보지 않도록
+            path = self._disk_path(key)
+            tmp = _tmp_path(path)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def get_or_create(self, key, make, remember=True):
+        """캐시에 있으면 그대로, 없으면 make()가 돌려준 BytesIO를 저장 후 bytes 반환"""
+        data = self.get(key, remember)
+        if data is None:
+            self.misses += 1
+            miss("pdf")
+            data = make().getvalue()
+            self.put(key, data, remember)
+        return data
+
+    def get_or_build(self, lesson_obj, builder, remember=True):
+        """Lesson 하나: 내용 해시(lesson_pdf_key)로 캐시, 없으면 builder(lesson_obj)"""
+        return self.get_or_create(lesson_pdf_key(lesson_obj), lambda: builder(lesson_obj), remember)
+
+
+def _tmp_path(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+# -------------------------------
+# 🔹 합본 PDF 캐시 (디스크 전용, 전체 크기 제한)
+# -------------------------------
+class WorkbookCache:
+    """
+    여러 Lesson 합본 PDF를 disk_dir 아래 '<키>.pdf'로 보관한다. 범위마다 파일이 생기므로
+    전체 크기가 max_bytes를 넘으면 가장 오래 안 쓴 파일(mtime, 적중할 때 갱신)부터 지운다.
+    메모리에는 올리지 않는다.
+    """
+
+    def __init__(self, disk_dir, max_bytes):
+        self.disk_dir = disk_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def open_or_create(self, key, build):
+        """
+        읽기용으로 연 파일 객체. 없으면 build(임시 경로)로 만든 뒤 한도를 맞춘다.
+        먼저 열어 두므로 다른 요청이 한도를 맞추며 지워도 끝까지 읽을 수 있다 (POSIX).
+        """
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+            os.utime(path)  # 최근 사용 표시 (atime은 noatime 마운트에서 갱신되지 않음)
+            hit("workbook")
+            return f
+        except FileNotFoundError:
+            pass
+        miss("workbook")
+        tmp = _tmp_path(path)
+        try:
+            build(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        f = open(path, "rb")
+        self._evict(keep=path)
+        return f
+
+    def _evict(self, keep):
+        with self._lock:
+            files = []
+            for entry in os.scandir(self.disk_dir):
+                if entry.name.endswith(".pdf") and entry.is_file():
+                    st_ = entry.stat()
+                    files.append((st_.st_mtime, st_.st_size, entry.path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:  # 이미 지워졌거나 (Windows) 읽는 중
+                    continue
+                total -= size
+                incr("workbook_evictions")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache():
+    """프로세스 공용 PdfCache (config 설정에 따라 디스크 캐시 사용)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfCache(PDF_CACHE_SIZE, PDF_CACHE_DIR if PDF_DISK_CACHE else None)
+    return _cache
+
+
+_workbooks = None
+
+
+def get_workbook_cache():
+    """프로세스 공용 WorkbookCache (디스크 캐시를 끄면 None → 호출한 쪽이 임시 파일 사용)"""
+    global _workbooks
+    if _workbooks is None and PDF_DISK_CACHE:
+        with _cache_lock:
+            if _workbooks is None:
+                _workbooks = WorkbookCache(WORKBOOK_CACHE_DIR, WORKBOOK_CACHE_MB * 1024 * 1024)
+    return _workbooks
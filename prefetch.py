@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import PREFETCH_WORKERS, AUDIO_SERVER
+from lesson_render import render_lesson
+from audio_index import read_audio
+from courses import get_course
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_lock = threading.Lock()
+_submitted = set()   # (코스 id, lesson 번호, 저장소 해시, PDF 포함) — 같은 Lesson을 여러 번 예열하지 않도록
+_digests = {}        # 코스 id → 마지막으로 본 저장소 해시
+
+
+# -------------------------------
+# 🔹 이웃 Lesson 예열
+# -------------------------------
+def warm_lesson(lesson_obj, course, pdf=False):
+    """화면 조각·오디오·문장 구간·(pdf=True면) 학습지 PDF를 미리 캐시에 올림"""
+    render_lesson(lesson_obj)
+    audio_path = course.audio_index.lookup(lesson_obj)
+    if audio_path and not AUDIO_SERVER:
+        read_audio(audio_path)
+    course.segment_index.segments(lesson_obj)
+    if pdf:
+        from worksheet import create_pdf_buffer
+        from pdf_cache import get_pdf_cache
+        get_pdf_cache().get_or_build(lesson_obj, create_pdf_buffer)
+
+
+def _run(key, lesson_obj, course):
+    try:
+        warm_lesson(lesson_obj, course, pdf=key[3])
+    except Exception:
+        # 예열 실패는 무시 (실제 요청 때 다시 계산됨). 다음 기회에 재시도하도록 표시 해제
+        with _lock:
+            _submitted.discard(key)
+
+
+def prefetch_around(position, radius=1, course=None, pdf=False):
+    """
+    현재 위치 ± radius Lesson을 백그라운드 스레드에서 예열 (이미 요청한 Lesson은 건너뜀).
+    학습지 PDF는 pdf=True일 때만 (화면이 어차피 PDF를 만드는 PDF_ON_DEMAND=False 설정 등)
+    """
+    course = course or get_course()
+    store = course.store
+    digest = store.digest
+    lessons = store.all()
+    cid = course.course_id
+    with _lock:
+        if _digests.get(cid) != digest:
+            _submitted.difference_update([k for k in _submitted if k[0] == cid])
+            _digests[cid] = digest
+        for pos in range(position - radius, position + radius + 1):
+            if pos == position or not 0 <= pos < len(lessons):
+                continue
+            lesson_obj = lessons[pos]
+            key = (cid, lesson_obj["lesson"], digest, pdf)
+            if key in _submitted:
+                continue
+            _submitted.add(key)
+            _executor.submit(_run, key, lesson_obj, course)
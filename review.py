@@ -0,0 +1,265 @@
+import time
+import heapq
+import atexit
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from config import REVIEW_DB
+from lesson_store import get_store
+from lesson_render import heading_html
+
+# SM-2 기본값
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+RELEARN_SECONDS = 10 * 60      # 틀린 카드는 10분 뒤 다시
+DAY = 24 * 60 * 60
+
+# 복습 기록은 모아서 한 번에 저장. 마지막 답 이후 WRITE_INTERVAL초가 지나면
+# 더 답하지 않아도 백그라운드 타이머가 저장 (SIGTERM은 atexit를 건너뛰므로)
+WRITE_BATCH = 20
+WRITE_INTERVAL = 5             # 초
+
+# 메모리에 둘 학습자별 스케줄러 수 (넘으면 가장 오래 안 쓴 학습자부터 저장 후 제거)
+MAX_SCHEDULERS = 64
+
+# 화면 버튼 → SM-2 점수 (0~5)
+GRADES = {"다시": 1, "어려움": 3, "좋음": 4, "쉬움": 5}
+
+
+# -------------------------------
+# 🔹 카드 (말하기 연습 "한국어 → English")
+# -------------------------------
+class Card:
+    __slots__ = ("card_id", "lesson", "order", "front", "back", "front_html", "back_html")
+
+    def __init__(self, card_id, lesson, order, front, back):
+        self.card_id = card_id
+        self.lesson = lesson
+        self.order = order
+        self.front = front
+        self.back = back
+        # 화면용 (escape된 한 줄 HTML → 내용 안의 *, _ 등이 markdown으로 해석되지 않음)
+        self.front_html = heading_html(front, 3)
+        self.back_html = heading_html(back, 4)
+
+
+def parse_practice(item):
+    """'• 한국어 문장 → English sentence' → (앞면, 뒷면) 또는 None"""
+    if "→" not in item:
+        return None
+    front, back = item.split("→", 1)
+    front, back = front.strip(" •\t"), back.strip()
+    if not front or not back:
+        return None
+    return front, back
+
+
+def build_cards(lessons):
+    """카드 id는 내용 해시라 Lesson 순서가 바뀌어도 복습 기록이 유지된다."""
+    cards = {}
+    for lesson_obj in lessons:
+        for item in lesson_obj.get("practice", []):
+            pair = parse_practice(item)
+            if not pair:
+                continue
+            card_id = hashlib.sha1("→".join(pair).encode("utf-8")).hexdigest()[:16]
+            cards.setdefault(card_id, Card(card_id, lesson_obj["lesson"], len(cards), *pair))
+    return cards
+
+
+# -------------------------------
+# 🔹 SM-2 상태
+# -------------------------------
+class CardState:
+    __slots__ = ("ease", "interval", "reps", "lapses", "due")
+
+    def __init__(self, ease=INITIAL_EASE, interval=0, reps=0, lapses=0, due=0.0):
+        self.ease = ease
+        self.interval = interval    # 일 단위
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due
+
+    def apply(self, grade, now):
+        """SM-2: 점수(0~5)에 따라 다음 간격과 난이도 계수 갱신"""
+        if grade < 3:
+            self.reps = 0
+            self.interval = 0
+            self.lapses += 1
+            self.due = now + RELEARN_SECONDS
+        else:
+            self.reps += 1
+            if self.reps == 1:
+                self.interval = 1
+            elif self.reps == 2:
+                self.interval = 6
+            else:
+                self.interval = round(self.interval * self.ease)
+            self.due = now + self.interval * DAY
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+
+# -------------------------------
+# 🔹 SQLite 저장소 (학습자별 카드 상태)
+# -------------------------------
+class ReviewDB:
+    def __init__(self, path=REVIEW_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS card_state ("
+                " learner TEXT NOT NULL, card_id TEXT NOT NULL,"
+                " ease REAL NOT NULL, interval INTEGER NOT NULL, reps INTEGER NOT NULL,"
+                " lapses INTEGER NOT NULL, due REAL NOT NULL, updated REAL NOT NULL,"
+                " PRIMARY KEY (learner, card_id))"
+            )
+
+    def load(self, learner):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT card_id, ease, interval, reps, lapses, due FROM card_state WHERE learner = ?",
+                (learner,),
+            ).fetchall()
+        return {row[0]: CardState(*row[1:]) for row in rows}
+
+    def save_many(self, learner, states, now):
+        """여러 카드 상태를 한 트랜잭션으로 저장"""
+        rows = [(learner, cid, s.ease, s.interval, s.reps, s.lapses, s.due, now) for cid, s in states.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO card_state"
+                " (learner, card_id, ease, interval, reps, lapses, due, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+
+# -------------------------------
+# 🔹 스케줄러 (힙으로 다음 카드 O(log n))
+# -------------------------------
+class ReviewScheduler:
+    """
+    학습자 한 명의 복습 큐. (due, 순서, card_id) 최소 힙에서 다음 카드를 꺼낸다.
+    답한 카드는 새 항목을 넣고 이전 항목은 꺼낼 때 버린다 (지연 삭제).
+    새 카드는 due=0이라 Lesson 순서대로 나온다.
+    """
+
+    def __init__(self, db, learner, cards):
+        self.db = db
+        self.learner = learner
+        self.cards = cards
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.time()
+        self._timer = None
+        saved = db.load(learner)
+        self.states = {cid: saved.get(cid) or CardState() for cid in cards}
+        self._heap = [(s.due, cards[cid].order, cid) for cid, s in self.states.items()]
+        heapq.heapify(self._heap)
+
+    def _peek(self):
+        heap = self._heap
+        while heap:
+            due, _, cid = heap[0]
+            if cid in self.states and self.states[cid].due == due:
+                return heap[0]
+            heapq.heappop(heap)  # 이미 다시 예약된 카드의 옛 항목
+        return None
+
+    def next_card(self, now=None):
+        """지금 복습할 카드 (없으면 None)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if self._pending and now - self._last_flush >= WRITE_INTERVAL:
+                self._flush_locked(now)
+            top = self._peek()
+        if top is None or top[0] > now:
+            return None
+        return self.cards[top[2]]
+
+    def next_due_time(self):
+        with self._lock:
+            top = self._peek()
+        return top[0] if top else None
+
+    def review(self, card_id, grade, now=None):
+        """답 기록. lessons.json이 바뀌어 없어진 카드(이전 화면의 버튼)면 무시하고 None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self.states.get(card_id)
+            if state is None:
+                return None
+            state.apply(grade, now)
+            heapq.heappush(self._heap, (state.due, self.cards[card_id].order, card_id))
+            self._pending[card_id] = state
+            if len(self._pending) >= WRITE_BATCH or now - self._last_flush >= WRITE_INTERVAL:
+                self._flush_locked(now)
+            elif self._timer is None:
+                # 더 답하지 않고 자리를 떠도 WRITE_INTERVAL 안에 저장
+                self._timer = threading.Timer(WRITE_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return state
+
+    def _flush_locked(self, now):
+        if self._pending:
+            self.db.save_many(self.learner, self._pending, now)
+            self._pending = {}
+        self._last_flush = now
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked(time.time())
+
+
+# -------------------------------
+# 🔹 프로세스 공용 스케줄러 (학습자별 1개)
+# -------------------------------
+_db = None
+_schedulers = OrderedDict()     # (학습자, 저장소 경로) → (digest, 스케줄러), 최근 사용 순
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(learner, store=None):
+    """
+    학습자·코스(저장소)별 스케줄러. lessons.json이 바뀌면 카드 목록을 다시 만들고,
+    그 전 기록은 먼저 저장. 카드 id가 내용 해시라 여러 코스가 같은 DB를 함께 쓴다.
+    """
+    global _db
+    store = store or get_store()
+    key = (learner, store.path)
+    digest = store.digest
+    with _schedulers_lock:
+        entry = _schedulers.get(key)
+        if entry and entry[0] == digest:
+            _schedulers.move_to_end(key)
+            return entry[1]
+        if entry:
+            entry[1].flush()
+        if _db is None:
+            _db = ReviewDB()
+        scheduler = ReviewScheduler(_db, learner, build_cards(store.all()))
+        _schedulers[key] = (digest, scheduler)
+        _schedulers.move_to_end(key)
+        while len(_schedulers) > MAX_SCHEDULERS:
+            _schedulers.popitem(last=False)[1][1].flush()
+    return scheduler
+
+
+def drop_schedulers(store_path):
+    """코스를 내릴 때: 그 저장소의 스케줄러 기록을 저장하고 메모리에서 제거"""
+    with _schedulers_lock:
+        for key in [k for k in _schedulers if k[1] == store_path]:
+            _schedulers.pop(key)[1].flush()
+
+
+@atexit.register
+def flush_all():
+    for _, scheduler in list(_schedulers.values()):
+        scheduler.flush()
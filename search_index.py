@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import math
+import heapq
+import threading
+from collections import Counter, defaultdict
+from config import SEARCH_INDEX_JSON
+from lesson_store import get_store
+from metrics import timed
+
+# 토큰화·필드 구성이 바뀌면 올려서 저장된 색인을 다시 만듦
+INDEX_VERSION = 2
+
+FIELDS = ("english", "korean", "grammar", "practice")
+FIELD_LABELS = {"english": "영어", "korean": "한국어", "grammar": "문법", "practice": "연습"}
+
+# BM25 파라미터
+K1 = 1.2
+B = 0.75
+PHRASE_BOOST = 2.0
+# 한글 한 글자 토큰의 가중치 (한 글자 질의 '책'이 '책을'에도 맞도록 색인하되, 2글자보다 약하게)
+UNIGRAM_WEIGHT = 0.5
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+HANGUL_RUN = re.compile(r"[가-힣]+")
+# 문법 항목 "• used to + 동사원형 → ..." 에서 영어 표현만 뽑기
+GRAMMAR_EXPR = re.compile(r"[•\s]*([^→]+?)\s*(?:→|$)")
+
+
+# -------------------------------
+# 🔹 토큰화
+# -------------------------------
+def normalize(text):
+    return text.casefold().replace("’", "'").replace("‘", "'")
+
+
+def tokenize(text, unigrams=False):
+    """
+    영어 단어 + 한글 2글자 n-gram (한 글자 단어는 그대로).
+    unigrams=True(색인할 때)면 두 글자 이상 어절의 각 글자도 함께 넣어
+    한 글자 질의('책')가 '책을', '책상'에도 맞게 한다.
+    """
+    text = normalize(text)
+    tokens = WORD.findall(text)
+    for run in HANGUL_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            if unigrams:
+                tokens.extend(run)
+    return tokens
+
+
+def token_weight(token):
+    if token.startswith("@"):
+        return PHRASE_BOOST
+    if len(token) == 1 and HANGUL_RUN.match(token):
+        return UNIGRAM_WEIGHT
+    return 1.0
+
+
+def grammar_expression(item):
+    """'• be satisfied with → ~에 만족하다' → 'be satisfied with' (+ 뒤 설명, ~ 기호 제거)"""
+    m = GRAMMAR_EXPR.match(item)
+    if not m:
+        return ""
+    expr = re.sub(r"\+.*|[~/]", " ", m.group(1))
+    return " ".join(WORD.findall(normalize(expr)))
+
+
+def lesson_units(lesson_obj):
+    """검색 단위 (필드, 순번, 텍스트): 영어 문장 / 한국어 줄 / 문법 항목 / 연습 항목"""
+    sentences = lesson_obj.get("sentences") or lesson_obj["english"].splitlines()
+    for i, text in enumerate(sentences):
+        yield "english", i, text
+    for i, text in enumerate(l for l in lesson_obj["korean"].splitlines() if l.strip()):
+        yield "korean", i, text
+    for field in ("grammar", "practice"):
+        for i, text in enumerate(lesson_obj.get(field, [])):
+            yield field, i, text
+
+
+# -------------------------------
+# 🔹 역색인
+# -------------------------------
+class SearchIndex:
+    """
+    문장/항목 단위 역색인 (BM25). 문법 표현("used to", "be satisfied with")은
+    구 단위 토큰('@used to')으로도 색인해 정확히 일치하면 가산점.
+    """
+
+    def __init__(self, docs=None, postings=None, lengths=None, digest=None):
+        self.docs = docs or []              # [[lesson, field, idx, text], ...]
+        self.postings = postings or {}      # token → [[doc_id, tf], ...]
+        self.lengths = lengths or []        # doc_id → 토큰 수
+        self.digest = digest
+        self.avg_len = (sum(self.lengths) / len(self.lengths)) if self.lengths else 1.0
+
+    @classmethod
+    def build(cls, lessons, digest=None):
+        docs, lengths = [], []
+        postings = defaultdict(list)
+        for lesson_obj in lessons:
+            for field, idx, text in lesson_units(lesson_obj):
+                doc_id = len(docs)
+                docs.append([lesson_obj["lesson"], field, idx, text])
+                tokens = tokenize(text, unigrams=True)
+                if field == "grammar":
+                    expr = grammar_expression(text)
+                    if expr:
+                        tokens.append("@" + expr)
+                lengths.append(len(tokens))
+                for token, tf in Counter(tokens).items():
+                    postings[token].append([doc_id, tf])
+        return cls(docs, dict(postings), lengths, digest)
+
+    # ---- 저장/불러오기 ----
+    def save(self, path):
+        data = {
+            "version": INDEX_VERSION,
+            "digest": self.digest,
+            "docs": self.docs,
+            "lengths": self.lengths,
+            "postings": self.postings,
+        }
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path, digest):
+        """저장된 색인이 현재 lessons.json(digest)과 같은 버전이면 불러오고, 아니면 None"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if data.get("version") != INDEX_VERSION or data.get("digest") != digest:
+            return None
+        return cls(data["docs"], data["postings"], data["lengths"], digest)
+
+    # ---- 검색 ----
+    @timed("search")
+    def search(self, query, limit=10):
+        """[(점수, lesson, field, idx, text), ...] 점수 높은 순"""
+        tokens = tokenize(query)
+        phrase = " ".join(WORD.findall(normalize(query)))
+        if phrase and " " in phrase:
+            tokens.append("@" + phrase)
+        if not tokens:
+            return []
+
+        n_docs = len(self.docs)
+        scores = defaultdict(float)
+        for token in set(tokens):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            weight = token_weight(token)
+            for doc_id, tf in postings:
+                norm = K1 * (1 - B + B * self.lengths[doc_id] / self.avg_len)
+                scores[doc_id] += weight * idf * tf * (K1 + 1) / (tf + norm)
+
+        # 원문에 질의가 그대로 들어 있으면 가산점 (구·어절 일치)
+        needle = normalize(query.strip())
+        top = heapq.nlargest(limit * 3, scores.items(), key=lambda kv: kv[1])
+        ranked = []
+        for doc_id, score in top:
+            lesson_no, field, idx, text = self.docs[doc_id]
+            if needle and needle in normalize(text):
+                score *= PHRASE_BOOST
+            ranked.append((score, lesson_no, field, idx, text))
+        ranked.sort(key=lambda r: -r[0])
+        return ranked[:limit]
+
+    def search_lessons(self, query, limit=10):
+        """Lesson 단위 순위: [(점수, lesson, 가장 잘 맞는 문장/항목), ...]"""
+        best = {}
+        for score, lesson_no, field, idx, text in self.search(query, limit * 5):
+            total, hit = best.get(lesson_no, (0.0, None))
+            best[lesson_no] = (total + score, hit or (field, idx, text))
+        ranked = sorted(((s, n, hit) for n, (s, hit) in best.items()), key=lambda r: -r[0])
+        return ranked[:limit]
+
+
+# -------------------------------
+# 🔹 프로세스 공용 색인 (lessons.json이 바뀌면 다시 만듦)
+# -------------------------------
+_indexes = {}
+_index_lock = threading.Lock()
+
+
+def get_search_index(path=SEARCH_INDEX_JSON, store=None):
+    """
+    저장된 색인이 현재 lessons.json과 맞으면 불러오고, 아니면 새로 만들어 저장.
+    이후에는 lessons.json 해시가 바뀔 때까지 메모리의 색인을 그대로 사용.
+    색인 파일(path)마다 하나씩 보관 (코스별 색인).
+    """
+    store = store or get_store()
+    path = os.path.abspath(path)
+    digest = store.digest
+    index = _indexes.get(path)
+    if index is not None and index.digest == digest:
+        return index
+    with _index_lock:
+        index = _indexes.get(path)
+        if index is None or index.digest != digest:
+            index = SearchIndex.load(path, digest)
+            if index is None:
+                index = SearchIndex.build(store.all(), digest)
+                try:
+                    index.save(path)
+                except OSError:
+                    pass  # 읽기 전용 배포 환경이면 메모리에만 유지
+            _indexes[path] = index
+    return index
+
+
+def drop_search_index(path):
+    with _index_lock:
+        _indexes.pop(os.path.abspath(path), None)
+
+
+# -------------------------------
+# 🚀 실행 진입점: 색인 생성 + 간단 검색
+# -------------------------------
+if __name__ == "__main__":
+    import sys
+
+    index = get_search_index()
+    print(f"🔎 색인: 문장/항목 {len(index.docs)}개, 토큰 {len(index.postings)}개 → {SEARCH_INDEX_JSON}")
+    for q in sys.argv[1:]:
+        print(f"\n'{q}'")
+        for score, lesson_no, field, idx, text in index.search(q, 5):
+            print(f"  {score:6.2f}  Lesson {lesson_no:02d} [{FIELD_LABELS[field]}] {text}")
@@ -1,13 +1,46 @@
 import os
-import json
+import time
 import streamlit as st
-from io import BytesIO
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from config import AUDIO_DIR, LESSONS_JSON
+from config import AUDIO_SERVER, PDF_ON_DEMAND, PREFETCH_PDF, METRICS_PANEL, EXPORT_APP_MAX_LESSONS
+from courses import get_registry, get_course
+from audio_index import read_audio
+from media_server import audio_url, AUDIO_MIME
+from lesson_render import render_lesson
+from prefetch import prefetch_around
+from search_index import FIELD_LABELS
+from review import GRADES
+from worksheet import create_pdf_buffer
+from pdf_cache import get_pdf_cache
+from workbook_export import EXPORT_FORMATS, range_positions, export_file_name, export_bytes
+from metrics import span, begin_rerun, end_rerun, snapshot, start_log_thread
+
+
+# ---------------------------
+# 성능 계측 (metrics.py): rerun별 구간 시간 + 선택적 사이드바 패널
+# ---------------------------
+begin_rerun()
+start_log_thread()
+
+
+def _finish_rerun():
+    spans = end_rerun()
+    if not (METRICS_PANEL or st.query_params.get("debug") == "1"):
+        return
+    with st.sidebar.expander("⏱️ 성능 | Timing", expanded=True):
+        total = snapshot()["timers"].get("rerun", {})
+        st.caption(f"이번 rerun 구간 (전체 rerun p50 {total.get('p50_ms', 0):.1f} ms, {total.get('count', 0)}회)")
+        st.table([{"구간": name, "ms": round(ms, 2)} for name, ms in spans] or [{"구간": "-", "ms": 0}])
+        st.caption("캐시 적중 (프로세스 누적)")
+        st.table([
+            {"캐시": cache, "적중": s["hits"], "실패": s["misses"], "적중률": f"{s['hit_ratio']:.0%}"}
+            for cache, s in snapshot()["caches"].items()
+        ] or [{"캐시": "-", "적중": 0, "실패": 0, "적중률": "-"}])
+
+
+def _rerun():
+    # st.rerun()은 예외로 스크립트를 끊으므로 맨 아래 _finish_rerun()까지 가지 않음 → 여기서 rerun 시간 기록
+    end_rerun()
+    st.rerun()
 
 
 # ---------------------------
@@ -18,25 +51,89 @@ st.title("🗣 1분 영어 말하기 | Speaking Matrix")
 st.markdown("🔹 Lesson 번호를 입력하거나 ⏮⏭ 버튼으로 이동하세요.")
 
 
+# ---------------------------
+# 코스 선택 (courses/ 아래 코스가 있을 때만 표시, courses.py)
+# ---------------------------
+def _on_course_change():
+    st.session_state.lesson_index = 0
+    st.session_state.search_query = ""
+    st.session_state.pdf_requested = None
+
+
+available_courses = get_registry().courses()
+if len(available_courses) > 1:
+    course_titles = {c.course_id: c.title for c in available_courses}
+    st.sidebar.selectbox(
+        "코스", list(course_titles), format_func=course_titles.get,
+        key="course_id", on_change=_on_course_change,
+    )
+course = get_course(st.session_state.get("course_id"))
+if course is None:
+    st.error("❌ lessons.json 파일을 찾을 수 없습니다.")
+    st.stop()
+
+
 # ---------------------------
 # 데이터 로드
 # ---------------------------
 def load_lessons():
-    if os.path.exists(LESSONS_JSON):
-        with open(LESSONS_JSON, "r", encoding="utf-8") as f:
-            return json.load(f)
-    st.error("❌ lessons.json 파일을 찾을 수 없습니다.")
-    return []
+    # 프로세스 공용 저장소: 파일이 바뀌지 않았으면 재파싱 없이 그대로 반환 (코스는 처음 열 때 로드)
+    with span("load_lessons"):
+        lessons = course.store.all()
+    if not lessons:
+        st.error("❌ lessons.json 파일을 찾을 수 없습니다.")
+    return lessons
 
 lessons = load_lessons()
 if not lessons:
     st.stop()
 
 
+# ---------------------------
+# 복습 모드: 말하기 연습 "한국어 → English" 카드 (SM-2, review.py)
+# ---------------------------
+def _show_answer(card_id):
+    st.session_state.review_shown = card_id
+
+
+def _grade(learner, card_id, grade):
+    course.scheduler(learner).review(card_id, grade)
+    st.session_state.review_shown = None
+
+
+def _on_mode_change():
+    # 복습을 마치면 모아 둔 답을 바로 저장
+    if st.session_state.mode != "🧠 복습":
+        course.scheduler(st.session_state.get("learner", "").strip() or "guest").flush()
+
+
+mode = st.sidebar.radio("모드", ["📖 학습", "🧠 복습"], key="mode", on_change=_on_mode_change)
+if mode == "🧠 복습":
+    learner = st.sidebar.text_input("학습자 이름", key="learner").strip() or "guest"
+    scheduler = course.scheduler(learner)
+    card = scheduler.next_card()
+    st.subheader("🧠 말하기 복습 | Speaking Review")
+    if card is None:
+        nxt = scheduler.next_due_time()
+        when = f" 다음 복습: {time.strftime('%m-%d %H:%M', time.localtime(nxt))}" if nxt else ""
+        st.success(f"🎉 지금 복습할 카드가 없습니다.{when}")
+    else:
+        st.caption(f"Lesson {card.lesson:02d} — 영어로 말해 보세요.")
+        st.markdown(card.front_html, unsafe_allow_html=True)
+        if st.session_state.get("review_shown") == card.card_id:
+            st.markdown(card.back_html, unsafe_allow_html=True)
+            for col, (label, grade) in zip(st.columns(len(GRADES)), GRADES.items()):
+                col.button(label, on_click=_grade, args=(learner, card.card_id, grade), use_container_width=True)
+        else:
+            st.button("정답 보기", on_click=_show_answer, args=(card.card_id,))
+    _finish_rerun()
+    st.stop()
+
+
 # ---------------------------
 # 세션 상태
 # ---------------------------
-if "lesson_index" not in st.session_state:
+if st.session_state.get("lesson_index", len(lessons)) >= len(lessons):
     st.session_state.lesson_index = 0
 if "lesson_query" not in st.session_state:
     # 입력창 기본은 항상 공백
@@ -44,29 +141,60 @@ if "lesson_query" not in st.session_state:
 
 
 # ---------------------------
-# 입력 콜백: Enter 시 이동 + 입력창 비우기
+# 입력 콜백: 번호면 이동, 그 외에는 검색 + 입력창 비우기
 # ---------------------------
 def _on_enter():
-    raw = st.session_state.lesson_query.strip().upper().replace("LESSON", "").strip()
+    query = st.session_state.lesson_query.strip()
+    raw = query.upper().replace("LESSON", "").strip()
     if raw.isdigit():
-        n = int(raw)
-        if 1 <= n <= len(lessons):
-            st.session_state.lesson_index = n - 1
+        # 입력한 값은 Lesson 번호 (코스에 따라 1부터 시작하지 않거나 중간이 비어 있을 수 있음)
+        _go_to_lesson(int(raw))
+    else:
+        st.session_state.search_query = query
     # 항상 비워서 공백 유지
     st.session_state.lesson_query = ""
 
 
+def _go_to_lesson(number):
+    pos = course.store.position(number)
+    if pos is not None:
+        st.session_state.lesson_index = pos
+    st.session_state.search_query = ""
+
+
+def _close_search():
+    st.session_state.search_query = ""
+
+
 # ---------------------------
 # Lesson 번호 입력창 (항상 공백 시작, Enter로 이동)
 # ---------------------------
 st.text_input(
-    "Lesson 번호 입력 (예: 5 또는 005)",
+    "Lesson 번호 또는 검색어 입력 (예: 5, 005, used to, 조깅)",
     key="lesson_query",
-    placeholder="번호 입력 후 Enter",
+    placeholder="번호 또는 단어 입력 후 Enter",
     on_change=_on_enter,  # ← Enter/변경 시 처리
 )
 
 
+# ---------------------------
+# 검색 결과 (영어·한국어·문법·연습 전체 색인, search_index.py)
+# ---------------------------
+if st.session_state.get("search_query"):
+    q = st.session_state.search_query
+    hits = course.search_index.search(q, limit=10)
+    with st.container(border=True):
+        st.markdown(f"🔎 **'{q}'** 검색 결과 {len(hits)}건")
+        for i, (score, lesson_no, field, idx, text) in enumerate(hits):
+            st.button(
+                f"Lesson {lesson_no:02d} · {FIELD_LABELS[field]} — {text}",
+                key=f"hit_{i}",
+                on_click=_go_to_lesson,
+                args=(lesson_no,),
+            )
+        st.button("닫기", key="search_close", on_click=_close_search)
+
+
 # ---------------------------
 # 이전/다음 버튼 (좌측 촘촘)
 # ---------------------------
@@ -75,15 +203,15 @@ with c1:
     if st.button("⏮ 이전", use_container_width=True):
         if st.session_state.lesson_index > 0:
             st.session_state.lesson_index -= 1
-            st.rerun()
+            _rerun()
 with c2:
     if st.button("⏭ 다음", use_container_width=True):
         if st.session_state.lesson_index < len(lessons) - 1:
             st.session_state.lesson_index += 1
-            st.rerun()
+            _rerun()
 with csp:
     st.markdown(
-        f"<div style='text-align:right;font-weight:700;'>현재 Lesson: {lessons[st.session_state.lesson_index]['lesson']:02d} / {len(lessons):02d}</div>",
+        f"<div style='text-align:right;font-weight:700;'>현재 Lesson: {lessons[st.session_state.lesson_index]['lesson']:02d} ({st.session_state.lesson_index + 1} / {len(lessons)})</div>",
         unsafe_allow_html=True,
     )
 
@@ -93,147 +221,111 @@ with csp:
 # ---------------------------
 lesson = lessons[st.session_state.lesson_index]
 
-# 제목 구성: "영문 | 한글"이 들어온 경우 분리
-title_en, title_ko = lesson["title"], ""
-if "|" in lesson["title"]:
-    parts = lesson["title"].split("|", 1)
-    title_en = parts[0].strip()
-    title_ko = parts[1].strip()
+# 화면 조각은 make_lessons_json.py가 escape해서 lessons.json에 저장해 둔 HTML
+fragments = render_lesson(lesson)
 
 # 버튼 바로 아래 제목 표시 (요청사항)
-st.markdown(
-    f"<h2 style='margin-top:8px;'>Lesson {lesson['lesson']:02d} — {title_en}"
-    + (f" | {title_ko}" if title_ko else "")
-    + "</h2>",
-    unsafe_allow_html=True,
-)
+st.markdown(fragments["header"], unsafe_allow_html=True)
 
 st.markdown("---")
 
 # ---------------------------
 # 오디오 (제목 바로 아래로 이동)
-# 파일명: "01. 한국제목.mp3"
-# ---------------------------
-num_str = str(lesson["lesson"]).zfill(2)
-try:
-    korean_title = lesson["title"].split("|")[1].strip()
-except IndexError:
-    korean_title = lesson["title"].strip()
-audio_filename = f"{num_str}. {korean_title}.mp3"
-audio_path = os.path.join(AUDIO_DIR, audio_filename)
-
-if os.path.exists(audio_path):
-    st.audio(audio_path)
+# 파일명: "01. 한국제목.mp3" (번호 기준 + 제목 유사도로 매칭, audio_index.py)
+# ---------------------------
+audio_path = course.audio_index.lookup(lesson)
+
+if audio_path:
+    # AUDIO_SERVER: 브라우저가 Range 요청으로 필요한 구간만 받고 재생은 브라우저 캐시 사용
+    # 그 외에는 프로세스 공용 캐시의 바이트를 사용 (이웃 Lesson은 미리 읽어 둠)
+    audio_format = AUDIO_MIME.get(os.path.splitext(audio_path)[1].lower(), "audio/mpeg")
+    audio_src = audio_url(lesson, course.course_id) if AUDIO_SERVER else read_audio(audio_path)
+    st.audio(audio_src, format=audio_format)
+
+    # 문장별 듣기 (audio_segments.py로 미리 계산한 구간이 있을 때만)
+    segments = course.segment_index.segments(lesson)
+    if segments:
+        with st.expander("🔁 문장별 듣기 | Sentence Replay"):
+            idx = st.selectbox(
+                "문장 선택",
+                range(len(segments)),
+                format_func=lambda i: f"{i + 1}. {lesson['sentences'][i]}",
+                key=f"sentence_{lesson['lesson']}",
+            )
+            start_ms, end_ms = segments[idx]
+            # st.audio는 초 단위 정수만 받으므로 구간을 바깥쪽으로 반올림
+            st.audio(
+                audio_src, format=audio_format,
+                start_time=start_ms // 1000, end_time=-(-end_ms // 1000), loop=True,
+            )
 else:
-    st.warning(f"🎧 오디오 파일을 찾을 수 없습니다: {audio_filename}")
+    st.warning(f"🎧 오디오 파일을 찾을 수 없습니다: {lesson['audio_filename']}")
 
 st.markdown("<br>", unsafe_allow_html=True)
 
 # ---------------------------
-# 본문 섹션 (구간 사이 공백 1줄)
+# 본문 섹션 (영어·한국어·문법·연습을 한 번에, 구간 사이 공백 1줄)
 # ---------------------------
-st.subheader("🗣 영어 문장 | English Sentences")
-st.markdown("<br>".join(lesson["english"].split("\n")), unsafe_allow_html=True)
-st.markdown("<br>", unsafe_allow_html=True)
+with span("render.body"):
+    st.markdown(fragments["body"], unsafe_allow_html=True)
 
-st.subheader("🇰🇷 한국어 번역 | Korean Translation")
-st.markdown("<br>".join(lesson["korean"].split("\n")), unsafe_allow_html=True)
-st.markdown("<br>", unsafe_allow_html=True)
 
-st.subheader("💡 문법·표현 포인트 | Grammar & Expressions")
-for g in lesson.get("grammar", []):
-    st.markdown(f"- {g}")
+# ---------------------------
+# PDF 생성·다운로드 (내용 해시 기반 캐시에서 제공)
+# ---------------------------
 st.markdown("<br>", unsafe_allow_html=True)
+pdf_cache = get_pdf_cache()
+pdf_file_name = f"Lesson_{lesson['lesson']:02d}.pdf"
 
-st.subheader("📝 말하기 연습 | Speaking Practice")
-for s in lesson.get("practice", []):
-    st.markdown(f"- {s}")
-
-
-# ---------------------------
-# PDF 생성·다운로드 (서버 저장 없이 바로)
-# ---------------------------
-def create_pdf_buffer(lesson_obj):
-    # 한글 폰트 등록
-    pdfmetrics.registerFont(UnicodeCIDFont('HYSMyeongJo-Medium'))
-    
-    # 스타일 정의 (한 페이지에 맞추기 위해 컴팩트하게)
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(
-        name='CompactTitle',
-        fontName='HYSMyeongJo-Medium',
-        fontSize=13,
-        leading=16,
-        spaceAfter=10,
-        alignment=1  # 가운데 정렬
-    ))
-    styles.add(ParagraphStyle(
-        name='CompactHeading',
-        fontName='HYSMyeongJo-Medium',
-        fontSize=10,
-        leading=14,
-        spaceAfter=6,
-        textColor='#333333'
-    ))
-    styles.add(ParagraphStyle(
-        name='CompactBody',
-        fontName='HYSMyeongJo-Medium',
-        fontSize=9,
-        leading=13,
-        spaceAfter=8
-    ))
-    
-    buf = BytesIO()
-    doc = SimpleDocTemplate(
-        buf, 
-        pagesize=A4,
-        rightMargin=50, 
-        leftMargin=50, 
-        topMargin=40, 
-        bottomMargin=40
+if PDF_ON_DEMAND and st.session_state.get("pdf_requested") != lesson["lesson"]:
+    # 요청 전에는 PDF를 만들지 않음 (reportlab도 이 시점엔 import되지 않음)
+    if st.button("📄 학습지 PDF 만들기"):
+        st.session_state.pdf_requested = lesson["lesson"]
+        _rerun()
+else:
+    st.download_button(
+        label="📄 학습지 PDF 다운로드",
+        data=pdf_cache.get_or_build(lesson, create_pdf_buffer),
+        file_name=pdf_file_name,
+        mime="application/pdf"
     )
-    story = []
-
-    # 제목
-    t_en, t_ko = lesson_obj["title"], ""
-    if "|" in t_en:
-        p = t_en.split("|", 1)
-        t_en, t_ko = p[0].strip(), p[1].strip()
-    full_title = f"<b>Lesson {lesson_obj['lesson']:02d} &mdash; {t_en}" + (f" | {t_ko}</b>" if t_ko else "</b>")
-    story.append(Paragraph(full_title, styles['CompactTitle']))
-    story.append(Spacer(1, 8))
-
-    # 영어 문장
-    story.append(Spacer(1, 20))
-    story.append(Paragraph("<b>영어 문장 | English Sentences</b>", styles['CompactHeading']))
-    story.append(Paragraph(lesson_obj["english"].replace("\n", "<br/>"), styles['CompactBody']))
-    
-    # 한국어 번역
-    story.append(Spacer(1, 15))
-    story.append(Paragraph("<b>한국어 번역 | Korean Translation</b>", styles['CompactHeading']))
-    story.append(Paragraph(lesson_obj["korean"].replace("\n", "<br/>"), styles['CompactBody']))
-    
-    # 문법·표현 포인트
-    story.append(Spacer(1, 15))
-    story.append(Paragraph("<b>문법&middot;표현 포인트 | Grammar &amp; Expressions</b>", styles['CompactHeading']))
-    grammar_text = "<br/>".join([f"&bull; {g}" for g in lesson_obj.get("grammar", [])])
-    story.append(Paragraph(grammar_text, styles['CompactBody']))
-    
-    # 말하기 연습
-    story.append(Spacer(1, 15))
-    story.append(Paragraph("<b>말하기 연습 | Speaking Practice</b>", styles['CompactHeading']))
-    practice_text = "<br/>".join([f"&bull; {s}" for s in lesson_obj.get("practice", [])])
-    story.append(Paragraph(practice_text, styles['CompactBody']))
-
-    doc.build(story)
-    buf.seek(0)
-    return buf
-
-pdf_buffer = create_pdf_buffer(lesson)
-st.markdown("<br>", unsafe_allow_html=True)
-st.download_button(
-    label="📄 학습지 PDF 다운로드",
-    data=pdf_buffer,
-    file_name=f"Lesson_{lesson['lesson']:02d}.pdf",
-    mime="application/pdf"
-)
+
+
+# ---------------------------
+# 여러 Lesson 한 번에 받기 (합본 PDF 또는 Lesson별 PDF zip, workbook_export.py)
+# ---------------------------
+with st.expander("📚 여러 Lesson 한 번에 받기 | Download Range"):
+    first_no, last_no = lessons[0]["lesson"], lessons[-1]["lesson"]
+    r1, r2, r3 = st.columns([0.25, 0.25, 0.5])
+    range_from = r1.number_input("시작 Lesson", first_no, last_no, first_no, key="range_from")
+    range_to = r2.number_input("끝 Lesson", first_no, last_no, last_no, key="range_to")
+    range_fmt = r3.radio(
+        "형식", list(EXPORT_FORMATS), key="range_fmt", horizontal=True,
+        format_func=lambda f: "합본 PDF" if f == "pdf" else "Lesson별 PDF (zip)",
+    )
+    # 개수와 양 끝만 위치 색인으로 계산. 범위 안 Lesson은 다운로드할 때만 디코딩
+    positions = range_positions(course.store, int(range_from), int(range_to))
+    if len(positions) > EXPORT_APP_MAX_LESSONS:
+        # 앱 다운로드는 파일 전체를 메모리에 만든 뒤 보내므로 범위를 제한
+        st.warning(
+            f"앱에서는 한 번에 {EXPORT_APP_MAX_LESSONS}개 Lesson까지 받을 수 있습니다. "
+            f"더 큰 범위는 Lesson API의 /workbooks/<시작>-<끝>.pdf|zip 을 사용하세요."
+        )
+    elif positions:
+        ends = [lessons[positions[0]], lessons[positions[-1]]]
+        # 버튼을 누를 때 만들어짐 (페이지 rerun을 막지 않음). 파일 전체를 메모리에 만든 뒤 전송
+        st.download_button(
+            label=f"⬇️ Lesson {ends[0]['lesson']:02d}–{ends[-1]['lesson']:02d} 받기 ({len(positions)}개)",
+            data=lambda: export_bytes([lessons[pos] for pos in positions], range_fmt),
+            file_name=export_file_name(ends, range_fmt),
+            mime=EXPORT_FORMATS[range_fmt],
+            key="range_download",
+        )
+
+
+# ---------------------------
+# 이웃 Lesson 미리 준비 (⏮/⏭ 클릭 시 캐시에서 바로 표시)
+# ---------------------------
+# 학습지 PDF는 버튼을 눌러야 만드는 설정(PDF_ON_DEMAND)에서는 미리 만들지 않음
+prefetch_around(st.session_state.lesson_index, course=course, pdf=PREFETCH_PDF and not PDF_ON_DEMAND)
+_finish_rerun()
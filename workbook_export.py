@@ -0,0 +1,123 @@
+import zipfile
+import tempfile
+from worksheet import create_pdf_buffer, build_workbook, workbook_key
+from pdf_cache import get_pdf_cache, get_workbook_cache
+from metrics import span
+
+# 합본 PDF를 내보낼 때 한 번에 보내는 크기
+STREAM_CHUNK = 64 * 1024
+
+EXPORT_FORMATS = {
+    "pdf": "application/pdf",
+    "zip": "application/zip",
+}
+
+# zip 항목 시각을 고정해 같은 Lesson 범위면 항상 같은 파일이 되도록 (ETag·캐시 재사용)
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+# -------------------------------
+# 🔹 범위 선택 / 파일명
+# -------------------------------
+def range_positions(store, first, last):
+    """first–last 범위(거꾸로 적어도 됨)에 드는 Lesson들의 store.all() 위치. Lesson은 디코딩하지 않음"""
+    if first > last:
+        first, last = last, first
+    return store.positions_between(first, last)
+
+
+def select_range(store, first, last):
+    lessons = store.all()
+    return [lessons[pos] for pos in range_positions(store, first, last)]
+
+
+def export_file_name(lesson_objs, fmt):
+    first, last = lesson_objs[0]["lesson"], lesson_objs[-1]["lesson"]
+    prefix = "Workbook" if fmt == "pdf" else "Lessons"
+    return f"{prefix}_{first:02d}-{last:02d}.{fmt}"
+
+
+def export_key(lesson_objs, fmt):
+    return f"{workbook_key(lesson_objs)}-{fmt}"
+
+
+# -------------------------------
+# 🔹 스트리밍 출력
+# -------------------------------
+class _ChunkSink:
+    """
+    zipfile이 쓰는 내용을 모아 두었다가 꺼내 가는 쓰기 전용 스트림.
+    seek가 없으므로 zipfile은 항목 뒤에 크기를 적는 방식(data descriptor)으로 써서
+    앞부분을 다시 고치지 않는다 → 쓴 만큼 바로 내보낼 수 있음.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(lesson_objs, builder=create_pdf_buffer):
+    """
+    Lesson별 PDF zip을 Lesson 하나가 끝날 때마다 조각으로 내보냄. PDF는 공용 캐시의
+    디스크 단계만 사용 (범위 전체를 메모리 LRU에 넣으면 화면에서 쓰던 PDF가 밀려남)
+    """
+    cache = get_pdf_cache()
+    sink = _ChunkSink()
+    # PDF는 이미 압축되어 있으므로 zip에서는 다시 압축하지 않음
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zf:
+        for lesson_obj in lesson_objs:
+            data = cache.get_or_build(lesson_obj, builder, remember=False)
+            info = zipfile.ZipInfo(f"Lesson_{lesson_obj['lesson']:02d}.pdf", ZIP_DATE_TIME)
+            zf.writestr(info, data)
+            yield sink.drain()
+    yield sink.drain()  # 중앙 디렉터리
+
+
+def _iter_file(f):
+    for block in iter(lambda: f.read(STREAM_CHUNK), b""):
+        yield block
+
+
+def iter_workbook(lesson_objs):
+    """
+    합본 PDF. ReportLab은 문서를 끝까지 만든 뒤에야 PDF를 쓰므로 파일로 한 번 만들고
+    조각으로 읽어 내보낸다. 크기 제한이 있는 합본 전용 디스크 캐시(generated_pdfs/workbooks)에
+    두고, 디스크 캐시를 끄면 임시 파일을 쓰고 지운다.
+    """
+    workbooks = get_workbook_cache()
+    if workbooks:
+        with workbooks.open_or_create(
+            workbook_key(lesson_objs), lambda target: build_workbook(lesson_objs, target)
+        ) as f:
+            yield from _iter_file(f)
+        return
+    with tempfile.TemporaryFile() as f:
+        build_workbook(lesson_objs, f)
+        f.seek(0)
+        yield from _iter_file(f)
+
+
+def iter_export(lesson_objs, fmt):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"지원하지 않는 형식: {fmt}")
+    with span(f"export.{fmt}"):
+        yield from (iter_workbook if fmt == "pdf" else iter_zip)(lesson_objs)
+
+
+def export_bytes(lesson_objs, fmt):
+    """
+    스트리밍을 받을 수 없는 곳(Streamlit download_button)용. 파일 전체를 메모리에 만들므로
+    앱에서는 EXPORT_APP_MAX_LESSONS개까지만 (더 큰 범위는 lesson_api.py의 /workbooks 스트리밍)
+    """
+    return b"".join(iter_export(lesson_objs, fmt))
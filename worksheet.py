@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+from io import BytesIO
+from types import SimpleNamespace
+from lesson_render import FRAGMENTS_VERSION, lesson_fragments
+from metrics import timed
+
+
+# 레이아웃(스타일·여백·구성)을 바꾸면 이 값을 올려서 캐시된 PDF를 무효화
+LAYOUT_VERSION = 1
+
+# PDF 내용에 영향을 주는 레슨 필드
+CONTENT_FIELDS = ("lesson", "title", "english", "korean", "grammar", "practice")
+
+
+def lesson_pdf_key(lesson_obj):
+    """레슨 내용 + 레이아웃 버전으로 만든 캐시 키 (내용이 같으면 항상 같은 키)"""
+    payload = {k: lesson_obj.get(k) for k in CONTENT_FIELDS}
+    raw = json.dumps([LAYOUT_VERSION, FRAGMENTS_VERSION, payload], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def workbook_key(lesson_objs):
+    """여러 Lesson 합본의 캐시 키 (구성 Lesson의 키를 순서대로 이어서 해시)"""
+    joined = ",".join(lesson_pdf_key(l) for l in lesson_objs)
+    return hashlib.sha1(joined.encode("ascii")).hexdigest()
+
+
+# ---------------------------
+# ReportLab 지연 로드 (첫 PDF 요청 시 프로세스당 1번만)
+# ---------------------------
+FONT_NAME = 'HYSMyeongJo-Medium'
+
+_rl = None
+_styles = None
+_rl_lock = threading.Lock()
+
+
+def _load_reportlab():
+    """reportlab import + 한글 폰트 등록 + 스타일 정의를 한 번만 수행"""
+    global _rl, _styles
+    if _rl is not None:
+        return _rl, _styles
+    with _rl_lock:
+        if _rl is not None:
+            return _rl, _styles
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+        # 한글 폰트 등록
+        pdfmetrics.registerFont(UnicodeCIDFont(FONT_NAME))
+
+        # 스타일 정의 (한 페이지에 맞추기 위해 컴팩트하게)
+        styles = getSampleStyleSheet()
+        styles.add(ParagraphStyle(
+            name='CompactTitle',
+            fontName=FONT_NAME,
+            fontSize=13,
+            leading=16,
+            spaceAfter=10,
+            alignment=1  # 가운데 정렬
+        ))
+        styles.add(ParagraphStyle(
+            name='CompactHeading',
+            fontName=FONT_NAME,
+            fontSize=10,
+            leading=14,
+            spaceAfter=6,
+            textColor='#333333'
+        ))
+        styles.add(ParagraphStyle(
+            name='CompactBody',
+            fontName=FONT_NAME,
+            fontSize=9,
+            leading=13,
+            spaceAfter=8
+        ))
+
+        _styles = styles
+        _rl = SimpleNamespace(
+            SimpleDocTemplate=SimpleDocTemplate,
+            Paragraph=Paragraph,
+            Spacer=Spacer,
+            PageBreak=PageBreak,
+            A4=A4,
+        )
+    return _rl, _styles
+
+
+# ---------------------------
+# 학습지 PDF 레이아웃 (Lesson 1개 = A4 1장)
+# ---------------------------
+def _new_doc(target):
+    rl, _ = _load_reportlab()
+    return rl.SimpleDocTemplate(
+        target, 
+        pagesize=rl.A4,
+        rightMargin=50, 
+        leftMargin=50, 
+        topMargin=40, 
+        bottomMargin=40
+    )
+
+
+def lesson_story(lesson_obj):
+    """Lesson 1개 분량의 flowable 목록 (단일 PDF와 합본 워크북이 함께 사용)"""
+    rl, styles = _load_reportlab()
+    Paragraph, Spacer = rl.Paragraph, rl.Spacer
+    # 마크업은 make_lessons_json.py가 escape해서 저장해 둔 조각 (lesson_render.pdf_fragments)
+    markup = lesson_fragments(lesson_obj)["pdf"]
+    story = []
+
+    # 제목
+    story.append(Paragraph(markup["title"], styles['CompactTitle']))
+    story.append(Spacer(1, 8))
+
+    # 영어 문장
+    story.append(Spacer(1, 20))
+    story.append(Paragraph("<b>영어 문장 | English Sentences</b>", styles['CompactHeading']))
+    story.append(Paragraph(markup["english"], styles['CompactBody']))
+    
+    # 한국어 번역
+    story.append(Spacer(1, 15))
+    story.append(Paragraph("<b>한국어 번역 | Korean Translation</b>", styles['CompactHeading']))
+    story.append(Paragraph(markup["korean"], styles['CompactBody']))
+    
+    # 문법·표현 포인트
+    story.append(Spacer(1, 15))
+    story.append(Paragraph("<b>문법&middot;표현 포인트 | Grammar &amp; Expressions</b>", styles['CompactHeading']))
+    story.append(Paragraph(markup["grammar"], styles['CompactBody']))
+    
+    # 말하기 연습
+    story.append(Spacer(1, 15))
+    story.append(Paragraph("<b>말하기 연습 | Speaking Practice</b>", styles['CompactHeading']))
+    story.append(Paragraph(markup["practice"], styles['CompactBody']))
+    return story
+
+
+@timed("pdf.build")
+def create_pdf_buffer(lesson_obj):
+    buf = BytesIO()
+    _new_doc(buf).build(lesson_story(lesson_obj))
+    buf.seek(0)
+    return buf
+
+
+@timed("pdf.workbook")
+def build_workbook(lesson_objs, target):
+    """여러 Lesson을 한 PDF로 (Lesson마다 새 페이지). target은 파일 경로 또는 쓰기 가능한 파일 객체"""
+    rl, _ = _load_reportlab()
+    story = []
+    for n, lesson_obj in enumerate(lesson_objs):
+        if n:
+            story.append(rl.PageBreak())
+        story.extend(lesson_story(lesson_obj))
+    _new_doc(target).build(story)
+
+
+def create_workbook_buffer(lesson_objs):
+    buf = BytesIO()
+    build_workbook(lesson_objs, buf)
+    buf.seek(0)
+    return buf